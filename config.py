@@ -34,6 +34,22 @@ class ModelConfig:
         "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
     )
     spacy_model: str = os.getenv("SPACY_MODEL", "fr_core_news_md")
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    rag_index_type: str = os.getenv("RAG_INDEX_TYPE", "flat")
+    rag_ivf_nlist: int = int(os.getenv("RAG_IVF_NLIST", "0"))
+    rag_nprobe: int = int(os.getenv("RAG_NPROBE", "16"))
+    rag_hnsw_m: int = int(os.getenv("RAG_HNSW_M", "32"))
+    rag_ef_construction: int = int(os.getenv("RAG_EF_CONSTRUCTION", "80"))
+    rag_ef_search: int = int(os.getenv("RAG_EF_SEARCH", "64"))
+    rag_pq_m: int = int(os.getenv("RAG_PQ_M", "48"))
+    rag_pq_nbits: int = int(os.getenv("RAG_PQ_NBITS", "8"))
+    rag_hybrid_search: bool = os.getenv("RAG_HYBRID_SEARCH", "true").lower() in {"1", "true", "yes"}
+    rag_hybrid_candidates: int = int(os.getenv("RAG_HYBRID_CANDIDATES", "50"))
+    rag_rrf_k: int = int(os.getenv("RAG_RRF_K", "60"))
+    rag_filter_exact_max: int = int(os.getenv("RAG_FILTER_EXACT_MAX", "4096"))
+    rag_cache_size: int = int(os.getenv("RAG_CACHE_SIZE", "1024"))
+    rag_cache_ttl_seconds: float = float(os.getenv("RAG_CACHE_TTL_SECONDS", "3600"))
+    rag_speaker_queries: bool = os.getenv("RAG_SPEAKER_QUERIES", "false").lower() in {"1", "true", "yes"}
 
 
 @dataclass(frozen=True)
@@ -46,12 +62,117 @@ class LimitsConfig:
     )
 
 
+@dataclass(frozen=True)
+class PreprocessingConfig:
+    """Paramètres du prétraitement audio."""
+
+    export_chunks: bool = os.getenv("EXPORT_AUDIO_CHUNKS", "false").lower() in {"1", "true", "yes"}
+    scratch_dir: Path = Path(
+        os.getenv("AUDIO_SCRATCH_DIR", PathConfig.data_dir / "processed_audio")
+    )
+    scratch_quota_mb: int = int(os.getenv("AUDIO_SCRATCH_QUOTA_MB", "2048"))
+    keep_scratch: bool = os.getenv("KEEP_AUDIO_SCRATCH", "false").lower() in {"1", "true", "yes"}
+    streaming: bool = os.getenv("STREAMING_PREPROCESSING", "false").lower() in {"1", "true", "yes"}
+    denoise_stationary: bool = os.getenv("DENOISE_STATIONARY", "false").lower() in {"1", "true", "yes"}
+    denoise_block_seconds: float = float(os.getenv("DENOISE_BLOCK_SECONDS", "60"))
+    denoise_overlap_seconds: float = float(os.getenv("DENOISE_OVERLAP_SECONDS", "1"))
+    denoise_noise_seconds: float = float(os.getenv("DENOISE_NOISE_SECONDS", "2"))
+    denoise_noise_source: str = os.getenv("DENOISE_NOISE_SOURCE", "silence")
+    denoise_workers: int = int(os.getenv("DENOISE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    chunking_mode: str = os.getenv("CHUNKING_MODE", "vad")
+    vad_margin_db: float = float(os.getenv("VAD_MARGIN_DB", "12"))
+    vad_min_speech_ms: int = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+    vad_min_silence_ms: int = int(os.getenv("VAD_MIN_SILENCE_MS", "600"))
+    vad_padding_ms: int = int(os.getenv("VAD_PADDING_MS", "200"))
+    vad_max_gap_ms: int = int(os.getenv("VAD_MAX_GAP_MS", "10000"))
+
+
+@dataclass(frozen=True)
+class ASRConfig:
+    """Paramètres d'exécution de la transcription."""
+
+    transcription_mode: str = os.getenv("TRANSCRIPTION_MODE", "sequential")
+    transcription_workers: int = int(
+        os.getenv("TRANSCRIPTION_WORKERS", str(max(1, (os.cpu_count() or 2) // 4)))
+    )
+    batch_size: int = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", "8"))
+    batch_max_wait_ms: int = int(os.getenv("TRANSCRIPTION_BATCH_MAX_WAIT_MS", "50"))
+    diarization_workers: int = int(os.getenv("DIARIZATION_WORKERS", "1"))
+    split_on_speaker_change: bool = os.getenv(
+        "DIARIZATION_SPLIT_SEGMENTS", "false"
+    ).lower() in {"1", "true", "yes"}
+
+
+@dataclass(frozen=True)
+class NLPConfig:
+    """Paramètres de l'analyse NLP juridique."""
+
+    batch_size: int = int(os.getenv("NLP_BATCH_SIZE", "16"))
+    spacy_processes: int = int(os.getenv("NLP_SPACY_PROCESSES", "1"))
+    classification_mode: str = os.getenv("NLP_CLASSIFICATION_MODE", "hybrid")
+    classification_min_confidence: float = float(
+        os.getenv("NLP_CLASSIFICATION_MIN_CONFIDENCE", "0.6")
+    )
+    windowed_analysis: bool = os.getenv("NLP_WINDOWED_ANALYSIS", "true").lower() in {"1", "true", "yes"}
+    window_tokens: int = int(os.getenv("NLP_WINDOW_TOKENS", "256"))
+    window_overlap_tokens: int = int(os.getenv("NLP_WINDOW_OVERLAP_TOKENS", "32"))
+
+
+@dataclass(frozen=True)
+class LLMConfig:
+    """Paramètres de génération du rapport par le LLM."""
+
+    model: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+    base_url: Optional[str] = os.getenv("OPENAI_BASE_URL")
+    prompt_token_budget: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "12000"))
+    max_tokens: int = int(os.getenv("LLM_MAX_TOKENS", "800"))
+    map_window_tokens: int = int(os.getenv("LLM_MAP_WINDOW_TOKENS", "3000"))
+    map_max_tokens: int = int(os.getenv("LLM_MAP_MAX_TOKENS", "300"))
+    max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    requests_per_minute: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    tokens_per_minute: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "160000"))
+    timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    backoff_base_seconds: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+    backoff_max_seconds: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+    cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() in {"1", "true", "yes"}
+    cache_path: Path = Path(
+        os.getenv("LLM_CACHE_PATH", PathConfig.data_dir / "llm_cache.sqlite3")
+    )
+    cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    cache_max_age_days: float = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+
+
+@dataclass(frozen=True)
+class JobsConfig:
+    """Paramètres de la file de traitement asynchrone des audiences."""
+
+    backend: str = os.getenv("JOBS_BACKEND", "memory")
+    max_workers: int = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+    max_queue_size: int = int(os.getenv("JOBS_MAX_QUEUE_SIZE", "8"))
+    sqlite_path: Path = Path(
+        os.getenv("JOBS_SQLITE_PATH", PathConfig.data_dir / "jobs.sqlite3")
+    )
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Démarrage du serveur et préchargement des modèles."""
+
+    warmup_on_startup: bool = os.getenv("SERVER_WARMUP_ON_STARTUP", "true").lower() in {"1", "true", "yes"}
+    # Liste séparée par des virgules ; vide = tous les composants du pipeline.
+    warmup_components: str = os.getenv("SERVER_WARMUP_COMPONENTS", "")
+    workers: int = int(os.getenv("SERVER_WORKERS", "1"))
+    preload: bool = os.getenv("SERVER_PRELOAD", "false").lower() in {"1", "true", "yes"}
+
+
 @dataclass(frozen=True)
 class APIConfig:
     """Clés API et secrets nécessaires."""
 
     openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
     huggingface_token: Optional[str] = os.getenv("HUGGINGFACE_TOKEN")
+    admin_token: Optional[str] = os.getenv("ADMIN_TOKEN")
 
 
 @dataclass(frozen=True)
@@ -61,6 +182,12 @@ class Settings:
     paths: PathConfig = PathConfig()
     models: ModelConfig = ModelConfig()
     limits: LimitsConfig = LimitsConfig()
+    preprocessing: PreprocessingConfig = PreprocessingConfig()
+    asr: ASRConfig = ASRConfig()
+    nlp: NLPConfig = NLPConfig()
+    llm: LLMConfig = LLMConfig()
+    jobs: JobsConfig = JobsConfig()
+    server: ServerConfig = ServerConfig()
     api: APIConfig = APIConfig()
 
 
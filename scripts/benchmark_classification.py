@@ -0,0 +1,78 @@
+"""Compare les modes de classification des affaires: précision et latence."""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from loguru import logger
+
+from src.nlp.legal_nlp import CLASSIFICATION_MODES, LegalNLPProcessor
+
+SAMPLE_CASES: List[Tuple[str, str]] = [
+    ("L'accusé a volé le téléphone de la victime à la sortie du marché.", "penal"),
+    ("Le prévenu a porté des coups à son voisin, qui a obtenu un certificat de 30 jours.", "penal"),
+    ("المتهم سرق الدراجة ديال الضحية وهرب", "penal"),
+    ("Le locataire n'a pas payé le loyer depuis six mois, le propriétaire demande l'expulsion.", "civil"),
+    ("La société réclame le paiement d'une créance prévue par le contrat de vente.", "civil"),
+    ("المدعي كيطالب بالتعويض على الضرر اللي وقع ليه فالعقد", "civil"),
+    ("L'épouse demande le divorce et la garde des deux enfants.", "famille"),
+    ("Le père conteste le montant de la pension alimentaire fixée par le tribunal.", "famille"),
+    ("الزوجة طالبت بالطلاق والنفقة ديال الولاد", "famille"),
+    ("Le salarié a été licencié sans préavis et réclame ses indemnités.", "travail"),
+    ("L'employeur n'a pas versé les salaires des trois derniers mois.", "travail"),
+    ("الأجير تطرد من الخدمة بلا سبب وكيطالب بالتعويض", "travail"),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Benchmark de la classification des affaires")
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        help="Fichier JSONL annoté ({\"text\": ..., \"label\": ...}) ; exemples intégrés sinon",
+    )
+    parser.add_argument(
+        "--modes", nargs="+", default=list(CLASSIFICATION_MODES), choices=CLASSIFICATION_MODES
+    )
+    parser.add_argument("--batch-size", type=int, default=8, help="Taille des lots")
+    return parser.parse_args()
+
+
+def load_cases(dataset: Path | None) -> List[Tuple[str, str]]:
+    """Lit les exemples annotés."""
+
+    if dataset is None:
+        return SAMPLE_CASES
+    with open(dataset, "r", encoding="utf-8") as dataset_file:
+        entries = [json.loads(line) for line in dataset_file if line.strip()]
+    return [(str(entry["text"]), str(entry["label"])) for entry in entries]
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    cases = load_cases(args.dataset)
+    texts = [text for text, _ in cases]
+    processor = LegalNLPProcessor()
+    for mode in args.modes:
+        # Un premier appel charge les modèles du mode hors de la mesure.
+        processor.classify_cases(texts[:1], args.batch_size, mode=mode)
+        started = time.perf_counter()
+        predictions = processor.classify_cases(texts, args.batch_size, mode=mode)
+        elapsed = time.perf_counter() - started
+        correct = sum(label == expected for (label, _), (_, expected) in zip(predictions, cases))
+        logger.info("Mode %s : %s/%s corrects", mode, correct, len(cases))
+        print(
+            f"{mode:<9} accuracy={correct / len(cases):.3f} "
+            f"latency_ms={1000 * elapsed / len(cases):.1f} total_s={elapsed:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Micro-benchmark de la fusion transcription/diarisation (balayage vs. naïf)."""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from typing import List
+
+from loguru import logger
+
+from src.asr.speaker_diarizer import assign_speakers
+from src.asr.whisper_transcriber import TranscriptSegment
+
+
+@dataclass
+class Interval:
+    """Équivalent minimal de ``pyannote.core.Segment``."""
+
+    start: float
+    end: float
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Benchmark de la fusion des locuteurs")
+    parser.add_argument("--segments", type=int, default=10_000, help="Segments de transcription")
+    parser.add_argument("--tracks", type=int, default=10_000, help="Pistes de locuteurs")
+    parser.add_argument(
+        "--check", type=int, default=2_000, help="Taille du sous-ensemble comparé au naïf"
+    )
+    return parser.parse_args()
+
+
+def generate(n_segments: int, n_tracks: int) -> tuple[List[TranscriptSegment], List[tuple]]:
+    """Génère une audience synthétique aux tours de parole aléatoires."""
+
+    rng = random.Random(0)
+    transcripts = []
+    cursor = 0.0
+    for _ in range(n_segments):
+        duration = rng.uniform(1.0, 8.0)
+        transcripts.append(TranscriptSegment(" ".join(["mot"] * 8), cursor, cursor + duration, None))
+        cursor += duration + rng.uniform(0.0, 0.5)
+    tracks = []
+    track_cursor = 0.0
+    step = cursor / n_tracks
+    for index in range(n_tracks):
+        duration = rng.uniform(0.5, 2.0) * step
+        label = f"SPEAKER_{rng.randrange(4):02d}"
+        tracks.append((Interval(track_cursor, track_cursor + duration), f"T{index}", label))
+        track_cursor += step
+    return transcripts, tracks
+
+
+def naive_assign(transcripts: List[TranscriptSegment], tracks: List[tuple]) -> List[str]:
+    """Référence O(N×M): cumule le recouvrement par locuteur pour chaque segment."""
+
+    speakers = []
+    for segment in transcripts:
+        totals: dict[str, float] = {}
+        for time_segment, track, label in tracks:
+            overlap = min(segment.end, time_segment.end) - max(segment.start, time_segment.start)
+            if overlap > 0:
+                totals[str(label or track)] = totals.get(str(label or track), 0.0) + overlap
+        speakers.append(max(totals, key=totals.__getitem__) if totals else "inconnu")
+    return speakers
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    transcripts, tracks = generate(args.segments, args.tracks)
+
+    started = time.perf_counter()
+    merged = assign_speakers(transcripts, tracks)
+    sweep_time = time.perf_counter() - started
+    logger.info("Balayage %sx%s : %.3f s", args.segments, args.tracks, sweep_time)
+
+    started = time.perf_counter()
+    assign_speakers(transcripts, tracks, split_on_speaker_change=True)
+    split_time = time.perf_counter() - started
+    logger.info("Balayage avec découpe des segments : %.3f s", split_time)
+
+    subset = transcripts[: args.check]
+    horizon = subset[-1].end if subset else 0.0
+    subset_tracks = [track for track in tracks if track[0].start < horizon]
+    started = time.perf_counter()
+    expected = naive_assign(subset, subset_tracks)
+    naive_time = time.perf_counter() - started
+    mismatches = sum(
+        segment.speaker != speaker for segment, speaker in zip(merged[: len(subset)], expected)
+    )
+    logger.info(
+        "Naïf sur %sx%s : %.3f s (%s écarts)",
+        len(subset),
+        len(subset_tracks),
+        naive_time,
+        mismatches,
+    )
+    print(
+        f"sweep_s={sweep_time:.3f} sweep_split_s={split_time:.3f} "
+        f"naive_subset_s={naive_time:.3f} mismatches={mismatches}"
+    )
+
+
+if __name__ == "__main__":
+    main()
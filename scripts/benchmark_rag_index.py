@@ -0,0 +1,95 @@
+"""Compare les types d'index FAISS du RAG: rappel@k, latence et taille sérialisée."""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+from loguru import logger
+
+from config import settings
+from src.rag.index_factory import INDEX_TYPES, build_index
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Benchmark des index FAISS du RAG")
+    parser.add_argument(
+        "--embeddings",
+        type=Path,
+        default=settings.paths.models_dir / "rag" / "embeddings.npy",
+        help="Embeddings du corpus (.npy) ; vecteurs synthétiques si absent",
+    )
+    parser.add_argument("--vectors", type=int, default=100_000, help="Taille du corpus synthétique")
+    parser.add_argument("--dimension", type=int, default=768, help="Dimension synthétique")
+    parser.add_argument("--queries", type=int, default=1_000, help="Nombre de requêtes")
+    parser.add_argument("--top-k", type=int, default=5, help="Profondeur du rappel@k")
+    parser.add_argument(
+        "--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES, help="Index testés"
+    )
+    return parser.parse_args()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalise les vecteurs pour que le produit scalaire soit un cosinus."""
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def load_vectors(args: argparse.Namespace) -> tuple[np.ndarray, np.ndarray]:
+    """Retourne (corpus, requêtes), issus des embeddings persistés ou synthétiques."""
+
+    rng = np.random.default_rng(0)
+    if args.embeddings.exists():
+        corpus = normalize(np.load(args.embeddings))
+        logger.info("Embeddings chargés depuis %s (%s vecteurs)", args.embeddings, len(corpus))
+        # Requêtes: articles du corpus légèrement bruités.
+        picks = rng.integers(0, len(corpus), size=args.queries)
+        noise = rng.normal(scale=0.05, size=(args.queries, corpus.shape[1]))
+        return corpus, normalize(corpus[picks] + noise)
+    # Données groupées pour imiter la structure thématique d'un corpus réel.
+    centers = rng.normal(size=(256, args.dimension))
+    labels = rng.integers(0, len(centers), size=args.vectors + args.queries)
+    vectors = normalize(centers[labels] + rng.normal(scale=0.6, size=(len(labels), args.dimension)))
+    return vectors[: args.vectors], vectors[args.vectors :]
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    corpus, queries = load_vectors(args)
+    ids = np.arange(len(corpus), dtype=np.int64)
+
+    baseline = None
+    for index_type in args.types:
+        started = time.perf_counter()
+        index = build_index(corpus, ids, index_type=index_type)
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, found = index.search(queries, args.top_k)
+        search_time = time.perf_counter() - started
+
+        if baseline is None:
+            reference = faiss.IndexFlatIP(corpus.shape[1])
+            reference.add(corpus)
+            _, baseline = reference.search(queries, args.top_k)
+        recall = np.mean(
+            [len(set(row) & set(expected)) / args.top_k for row, expected in zip(found, baseline)]
+        )
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+        print(
+            f"{index_type:<9} build_s={build_time:.2f} "
+            f"latency_ms={1000 * search_time / len(queries):.3f} "
+            f"recall@{args.top_k}={recall:.3f} size_mb={size_mb:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare le débruitage par blocs au traitement d'origine en une passe (écart de SNR).
+
+La référence est toujours ``reduce_noise(y=audio, sr=sr)`` (mode non stationnaire),
+y compris lorsque les blocs utilisent le mode stationnaire (``--stationary``).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from loguru import logger
+from noisereduce import reduce_noise
+
+from src.preprocessing.denoiser import BlockDenoiser
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Régression du débruitage par blocs")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Durée du signal synthétique")
+    parser.add_argument("--workers", type=int, default=4, help="Nombre de workers")
+    parser.add_argument(
+        "--stationary", action="store_true", help="Blocs en mode stationnaire (DENOISE_STATIONARY)"
+    )
+    parser.add_argument(
+        "--tolerance-db", type=float, default=0.5, help="Perte de SNR maximale acceptée"
+    )
+    return parser.parse_args()
+
+
+def synthetic_hearing(seconds: float, sample_rate: int) -> tuple[np.ndarray, np.ndarray]:
+    """Génère une « parole » modulée entrecoupée de silences, plus un bruit blanc."""
+
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * freq * time_axis) for freq in (180.0, 360.0, 720.0)) / 3
+    envelope = (np.sin(2 * np.pi * 0.2 * time_axis) > 0).astype(np.float32)
+    clean = (0.3 * voice * envelope).astype(np.float32)
+    noisy = clean + rng.normal(0, 0.03, size=clean.shape).astype(np.float32)
+    return clean, noisy
+
+
+def snr_db(reference: np.ndarray, estimate: np.ndarray) -> float:
+    """Rapport signal/bruit de l'estimation par rapport au signal propre."""
+
+    error = np.sum((estimate - reference) ** 2)
+    return float(10 * np.log10(np.sum(reference**2) / max(error, 1e-12)))
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    sample_rate = 16_000
+    clean, noisy = synthetic_hearing(args.seconds, sample_rate)
+    denoiser = BlockDenoiser(sample_rate, workers=args.workers, stationary=args.stationary)
+
+    started = time.perf_counter()
+    baseline = reduce_noise(y=noisy, sr=sample_rate)
+    baseline_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    blockwise = denoiser.denoise(noisy)
+    block_time = time.perf_counter() - started
+    denoiser.shutdown()
+
+    baseline_snr = snr_db(clean, baseline)
+    block_snr = snr_db(clean, blockwise)
+    loss = baseline_snr - block_snr
+    logger.info("Référence : SNR %.2f dB en %.2f s", baseline_snr, baseline_time)
+    logger.info("Par blocs : SNR %.2f dB en %.2f s", block_snr, block_time)
+    print(
+        f"mode={'stationary' if args.stationary else 'nonstationary'} "
+        f"baseline_snr_db={baseline_snr:.2f} block_snr_db={block_snr:.2f} loss_db={loss:.3f}"
+    )
+    if loss > args.tolerance_db:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
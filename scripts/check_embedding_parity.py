@@ -0,0 +1,89 @@
+"""Vérifie la parité des embeddings ONNX / int8 avec le modèle PyTorch (cosinus)."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+from src.rag.embedding_backend import load_encoder
+
+SAMPLE_TEXTS = [
+    "Quiconque, volontairement, fait des blessures ou porte des coups à autrui.",
+    "Le contrat de travail à durée indéterminée peut être rompu par la volonté de l'une des parties.",
+    "La pension alimentaire est due aux enfants jusqu'à leur majorité.",
+    "L'accusé nie avoir été présent sur les lieux au moment des faits.",
+    "الطرف المدني كيطالب بالتعويض على الضرر اللي وقع ليه",
+    "المحكمة قررت تأجيل الجلسة للأسبوع الجاي",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Parité des backends d'embedding")
+    parser.add_argument(
+        "--backend", choices=("onnx", "onnx-int8"), default="onnx-int8", help="Backend comparé"
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=settings.paths.data_dir / "corpus" / "legal_corpus.json",
+        help="Corpus dont les textes servent d'échantillon (textes intégrés si absent)",
+    )
+    parser.add_argument("--limit", type=int, default=500, help="Nombre maximal de textes")
+    parser.add_argument(
+        "--min-cosine", type=float, default=0.98, help="Similarité minimale acceptée par texte"
+    )
+    return parser.parse_args()
+
+
+def load_texts(corpus: Path, limit: int) -> List[str]:
+    """Textes du corpus juridique, ou phrases d'exemple si le corpus est absent."""
+
+    if corpus.exists():
+        with open(corpus, "r", encoding="utf-8") as corpus_file:
+            texts = [str(entry.get("text", "")) for entry in json.load(corpus_file)]
+        texts = [text for text in texts if text.strip()]
+        if texts:
+            return texts[:limit]
+    return SAMPLE_TEXTS
+
+
+def timed_encode(encoder, texts: List[str]) -> tuple[np.ndarray, float]:
+    """Encode les textes et retourne (embeddings normalisés, durée en secondes)."""
+
+    started = time.perf_counter()
+    vectors = np.asarray(encoder.encode(texts, normalize_embeddings=True), dtype=np.float32)
+    return vectors, time.perf_counter() - started
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    texts = load_texts(args.corpus, args.limit)
+    reference, reference_time = timed_encode(load_encoder("torch"), texts)
+    candidate, candidate_time = timed_encode(load_encoder(args.backend), texts)
+
+    cosines = np.sum(reference * candidate, axis=1)
+    logger.info(
+        "%s textes : torch %.2f s, %s %.2f s", len(texts), reference_time, args.backend, candidate_time
+    )
+    print(
+        f"backend={args.backend} texts={len(texts)} min_cosine={cosines.min():.4f} "
+        f"mean_cosine={cosines.mean():.4f} speedup={reference_time / max(candidate_time, 1e-9):.2f}x"
+    )
+    if cosines.min() < args.min_cosine:
+        logger.error("Parité insuffisante: cosinus minimal %.4f < %.4f", cosines.min(), args.min_cosine)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Contrôle le client LLM asynchrone contre un faux serveur OpenAI local lent.
+
+Lance plusieurs générations de rapport en parallèle (comme les workers du
+pipeline) et vérifie que le nombre de requêtes simultanées ne dépasse jamais
+``LLM_MAX_CONCURRENCY`` et que les réponses 429 sont réessayées avec succès.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SlowOpenAIHandler(BaseHTTPRequestHandler):
+    """Répond lentement à ``POST /v1/chat/completions`` et refuse une requête sur ``reject_every``."""
+
+    latency = 0.2
+    reject_every = 4
+    lock = threading.Lock()
+    received = 0
+    rejected = 0
+    in_flight = 0
+    peak_in_flight = 0
+
+    def do_POST(self) -> None:  # noqa: N802 - nom imposé par BaseHTTPRequestHandler
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        cls = type(self)
+        with cls.lock:
+            cls.received += 1
+            reject = cls.reject_every > 0 and cls.received % cls.reject_every == 0
+            cls.rejected += reject
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            time.sleep(cls.latency)
+            if reject:
+                self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, "0.1")
+                return
+            self._send(
+                200,
+                {
+                    "id": "chatcmpl-local",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": payload.get("model", "fake"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "Résumé\n- Fait\n\nRecommandations\n- Action",
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                },
+            )
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _send(self, status: int, payload: dict, retry_after: str = "") -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Contrôle de concurrence du client LLM")
+    parser.add_argument("--reports", type=int, default=24, help="Rapports générés en parallèle")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM_MAX_CONCURRENCY")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence simulée (s)")
+    parser.add_argument("--reject-every", type=int, default=4, help="Une requête sur N reçoit un 429")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    SlowOpenAIHandler.latency = args.latency
+    SlowOpenAIHandler.reject_every = args.reject_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # La configuration est lue à l'import: l'environnement doit être prêt avant.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "sk-local"
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["LLM_BACKOFF_BASE_SECONDS"] = "0.05"
+
+    from src.asr.speaker_diarizer import SpeakerSegment
+    from src.nlp.llm_generator import LLMGenerator
+    from src.rag.legal_rag import LegalArticle
+
+    articles = [
+        LegalArticle("Code Pénal Marocain", "400", "Quiconque, volontairement...", "penal", ["coups"])
+    ]
+    generator = LLMGenerator()
+
+    def generate(index: int):
+        transcript = [SpeakerSegment("SPEAKER_00", f"Déclaration {index}", 0.0, 2.0)]
+        return generator.build_report(transcript, articles, '{"categorie":"penal"}')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.reports) as executor:
+        results = list(executor.map(generate, range(args.reports)))
+    elapsed = time.perf_counter() - start
+    generator.close()
+    server.shutdown()
+
+    handler = SlowOpenAIHandler
+    print(
+        f"reports={len(results)} requests={handler.received} rejected={handler.rejected} "
+        f"peak_in_flight={handler.peak_in_flight} max_concurrency={args.concurrency} "
+        f"elapsed_s={elapsed:.2f}"
+    )
+    if handler.peak_in_flight > args.concurrency or any(not r.summary for r in results):
+        print("Échec: concurrence dépassée ou rapport manquant", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Rejoue la génération de rapport contre un faux serveur OpenAI local.
+
+Vérifie qu'une longue audience déclenche le résumé par fenêtres et que chaque
+prompt envoyé respecte le budget de tokens configuré.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Répond à ``POST /v1/chat/completions`` avec une réponse fixe et journalise la requête."""
+
+    requests: List[Dict] = []
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:  # noqa: N802 - nom imposé par BaseHTTPRequestHandler
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with self.lock:
+            self.requests.append(payload)
+        content = (
+            "Résumé\n- Fait : altercation devant le tribunal\n\n"
+            "Recommandations\n- Vérifier les témoignages (confiance : moyenne)"
+        )
+        body = json.dumps(
+            {
+                "id": "chatcmpl-local",
+                "object": "chat.completion",
+                "created": 0,
+                "model": payload.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Contrôle du budget de tokens du prompt LLM")
+    parser.add_argument("--segments", type=int, default=2_000, help="Segments de l'audience")
+    parser.add_argument("--budget", type=int, default=4_000, help="LLM_PROMPT_TOKEN_BUDGET")
+    parser.add_argument("--window", type=int, default=1_500, help="LLM_MAP_WINDOW_TOKENS")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # La configuration est lue à l'import: l'environnement doit être prêt avant.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "sk-local"
+    os.environ["LLM_PROMPT_TOKEN_BUDGET"] = str(args.budget)
+    os.environ["LLM_MAP_WINDOW_TOKENS"] = str(args.window)
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    from src.asr.speaker_diarizer import SpeakerSegment
+    from src.nlp.llm_generator import LLMGenerator
+    from src.nlp.prompt_builder import compact_nlp_context
+    from src.rag.legal_rag import LegalArticle
+
+    transcript = [
+        SpeakerSegment(
+            speaker=f"SPEAKER_{index % 3:02d}",
+            text=f"Déclaration numéro {index} concernant les faits reprochés et les preuves.",
+            start=index * 4.0,
+            end=index * 4.0 + 3.5,
+        )
+        for index in range(args.segments)
+    ]
+    articles = [
+        LegalArticle("Code Pénal Marocain", "400", "Quiconque, volontairement...", "penal", ["coups"])
+    ]
+    nlp_summary = compact_nlp_context(
+        {
+            "entities": [{"text": "Rabat", "label": "LOC"}] * 50,
+            "sentiment": "negative",
+            "sentiment_score": 0.71,
+            "category": "penal",
+            "category_scores": {"penal": 0.8, "civil": 0.2},
+            "keywords": ["coups", "plainte"],
+        }
+    )
+
+    generator = LLMGenerator()
+    builder = generator.prompt_builder
+    full_prompt = builder.compose(
+        "\n".join(builder.transcript_lines(transcript)), builder.articles_text(articles), nlp_summary
+    )
+    needs_map = not builder.fits(full_prompt)
+    result = generator.build_report(transcript, articles, nlp_summary)
+    server.shutdown()
+
+    counter = builder.counter
+    prompts = [request["messages"][-1]["content"] for request in FakeOpenAIHandler.requests]
+    largest = max(counter.count(prompt) for prompt in prompts)
+    print(
+        f"full_prompt_tokens={counter.count(full_prompt)} requests={len(prompts)} "
+        f"largest_prompt_tokens={largest} budget={args.budget} "
+        f"recommendations={len(result.recommendations)}"
+    )
+    if (needs_map and len(prompts) < 2) or largest > args.budget:
+        print("Échec: résumé par fenêtres absent ou budget dépassé", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
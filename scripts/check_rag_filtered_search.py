@@ -0,0 +1,103 @@
+"""Vérifie la recherche dense filtrée par catégorie pour chaque type d'index FAISS.
+
+Un corpus synthétique dont la catégorie dépasse ``RAG_FILTER_EXACT_MAX`` est
+indexé avec chaque type ; la recherche ne doit pas échouer, ne doit retourner
+que des articles de la catégorie et doit retrouver l'essentiel du top-k exact.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+import faiss
+import numpy as np
+from loguru import logger
+
+from config import settings
+from src.rag.index_factory import INDEX_TYPES, build_index, supports_filtered_search
+from src.rag.legal_rag import LegalArticle, LegalRAG, _IndexState
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Recherche filtrée par catégorie du RAG")
+    parser.add_argument("--vectors", type=int, default=12_000, help="Taille du corpus synthétique")
+    parser.add_argument("--dimension", type=int, default=96, help="Dimension (multiple de RAG_PQ_M)")
+    parser.add_argument("--queries", type=int, default=50, help="Nombre de requêtes")
+    parser.add_argument("--top-k", type=int, default=5, help="Profondeur du rappel@k")
+    parser.add_argument("--min-recall", type=float, default=0.5, help="Rappel@k minimal accepté")
+    parser.add_argument(
+        "--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES, help="Index testés"
+    )
+    return parser.parse_args()
+
+
+def synthetic_corpus(args: argparse.Namespace) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Retourne (embeddings, requêtes, catégorie par ligne), sur deux catégories."""
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(64, args.dimension))
+    labels = rng.integers(0, len(centers), size=args.vectors + args.queries)
+    vectors = centers[labels] + rng.normal(scale=0.6, size=(len(labels), args.dimension))
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    categories = np.where(rng.random(args.vectors) < 0.5, "civil", "penal")
+    return vectors[: args.vectors], vectors[args.vectors :], categories
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    embeddings, queries, categories = synthetic_corpus(args)
+    ids = np.arange(1, len(embeddings) + 1, dtype=np.int64)
+    articles = {
+        int(identifier): LegalArticle(
+            code="synthetique",
+            article=str(identifier),
+            text=f"article {identifier}",
+            category=str(category),
+            keywords=[],
+        )
+        for identifier, category in zip(ids, categories)
+    }
+    rows = np.flatnonzero(categories == "civil")
+    if rows.size <= settings.models.rag_filter_exact_max:
+        logger.warning(
+            "Catégorie de %s articles, sous RAG_FILTER_EXACT_MAX (%s): chemin exact seul",
+            rows.size,
+            settings.models.rag_filter_exact_max,
+        )
+    exact = embeddings[rows] @ queries.T
+    expected = [set(rows[np.argsort(-column)[: args.top_k]]) for column in exact.T]
+
+    failed = False
+    for index_type in args.types:
+        index = build_index(embeddings, ids, index_type=index_type)
+        state = _IndexState(
+            index=index, articles=articles, ids=ids, embeddings=embeddings, version=0
+        )
+        try:
+            rankings = LegalRAG._dense_rankings(state, queries, args.top_k, rows)
+        except RuntimeError as exc:
+            print(f"{index_type:<9} ERREUR {exc}")
+            failed = True
+            continue
+        allowed = set(rows.tolist())
+        outside = sum(row not in allowed for ranking in rankings for row in ranking)
+        recall = np.mean(
+            [len(set(ranking) & best) / args.top_k for ranking, best in zip(rankings, expected)]
+        )
+        path = "ann" if supports_filtered_search(index) else "exact"
+        print(
+            f"{index_type:<9} path={path} outside_category={outside} "
+            f"recall@{args.top_k}={recall:.3f}"
+        )
+        failed = failed or outside > 0 or recall < args.min_recall
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Vérifie les chunks produits par le prétraitement en flux (``AudioProcessor.stream``).
+
+Une audience synthétique est écrite en WAV puis découpée en flux, en mode
+fixe puis VAD : aucun chunk ne doit dépasser ``chunk_duration`` (Whisper et
+``BatchScheduler`` refusent les entrées de plus de 30 s), et en mode fixe les
+chunks doivent couvrir tout le signal sans trou ni chevauchement.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from loguru import logger
+
+from src.preprocessing.audio_processor import AudioProcessor
+from src.preprocessing.vad import SpeechChunker
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Régression du prétraitement en flux")
+    parser.add_argument("--seconds", type=float, default=91.0, help="Durée du signal synthétique")
+    parser.add_argument("--chunk-seconds", type=int, default=30, help="Durée maximale d'un chunk")
+    return parser.parse_args()
+
+
+def synthetic_hearing(seconds: float, sample_rate: int) -> np.ndarray:
+    """Génère une « parole » modulée entrecoupée de silences, plus un bruit blanc."""
+
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * freq * time_axis) for freq in (180.0, 360.0, 720.0)) / 3
+    envelope = (np.sin(2 * np.pi * 0.2 * time_axis) > 0).astype(np.float32)
+    noisy = 0.3 * voice * envelope + rng.normal(0, 0.03, size=time_axis.shape)
+    return noisy.astype(np.float32)
+
+
+def check_mode(processor: AudioProcessor, audio_path: Path, total: int, mode: str) -> bool:
+    """Découpe le fichier en flux et contrôle la durée et la couverture des chunks."""
+
+    max_samples = processor.chunk_duration * processor.target_sr
+    chunks = list(processor.stream(audio_path))
+    lengths = [chunk.samples.shape[0] for chunk in chunks]
+    too_long = [length for length in lengths if length > max_samples]
+    ok = not too_long
+    if mode == "fixed":
+        starts = [round(chunk.start_time * processor.target_sr) for chunk in chunks]
+        contiguous = starts == list(np.cumsum([0] + lengths[:-1]))
+        ok = ok and contiguous and sum(lengths) == total
+    print(
+        f"mode={mode} chunks={len(chunks)} "
+        f"max_chunk_s={max(lengths) / processor.target_sr:.2f} "
+        f"total_s={sum(lengths) / processor.target_sr:.2f} ok={ok}"
+    )
+    return ok
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    processor = AudioProcessor(chunk_duration=args.chunk_seconds, export_chunks=False)
+    samples = synthetic_hearing(args.seconds, processor.target_sr)
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        audio_path = Path(directory) / "hearing.wav"
+        sf.write(audio_path, samples, processor.target_sr, subtype="PCM_16")
+        processor.chunker = None
+        ok &= check_mode(processor, audio_path, samples.shape[0], "fixed")
+        processor.chunker = SpeechChunker(processor.target_sr, args.chunk_seconds)
+        ok &= check_mode(processor, audio_path, samples.shape[0], "vad")
+    processor.denoiser.shutdown()
+    if not ok:
+        logger.error("Chunk de plus de %s s ou découpage fixe incomplet", args.chunk_seconds)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Mesure le temps d'import des modules ``src.*`` avec ``python -X importtime``.
+
+Chaque module est importé dans un interpréteur neuf ; le script affiche son
+temps d'import cumulé et les dépendances les plus coûteuses.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = [
+    "src.api.main",
+    "src.pipeline.main_pipeline",
+    "src.rag.legal_rag",
+    "src.nlp.legal_nlp",
+    "src.nlp.llm_generator",
+    "src.asr.whisper_transcriber",
+    "src.asr.speaker_diarizer",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Temps d'import des modules du projet")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules à importer")
+    parser.add_argument("--top", type=int, default=10, help="Dépendances affichées par module")
+    parser.add_argument(
+        "--max-seconds", type=float, default=0.0, help="Échec si un import dépasse ce seuil (0 = aucun)"
+    )
+    return parser.parse_args()
+
+
+def measure(module: str) -> List[Tuple[str, float, float]]:
+    """Retourne (module importé, temps propre, temps cumulé) en secondes, dans l'ordre de sortie."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1:] or ["erreur inconnue"]
+        raise RuntimeError(f"Import de {module} impossible: {last_line[0]}")
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        entries.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return entries
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    slow = []
+    for module in args.modules:
+        entries = measure(module)
+        total = next((cumulative for name, _, cumulative in entries if name == module), 0.0)
+        print(f"module={module} import_seconds={total:.3f}")
+        top_level = [entry for entry in entries if entry[0] != module and "." not in entry[0]]
+        for name, _, cumulative in sorted(top_level, key=lambda entry: -entry[2])[: args.top]:
+            print(f"  {name:<32} {cumulative:8.3f} s")
+        if args.max_seconds and total > args.max_seconds:
+            slow.append(module)
+    if slow:
+        print(f"Imports trop lents: {', '.join(slow)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
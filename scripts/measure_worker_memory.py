@@ -0,0 +1,70 @@
+"""Mesure la mémoire des workers du serveur (Linux, ``/proc``).
+
+Pour chaque processus enfant du maître gunicorn/uvicorn, affiche la RSS, la PSS
+(mémoire partagée répartie entre processus) et la mémoire privée. En mode
+``--preload``, la mémoire privée d'un worker doit rester faible devant sa RSS.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Mémoire des workers du serveur API")
+    parser.add_argument("pid", type=int, help="PID du processus maître")
+    return parser.parse_args()
+
+
+def children(pid: int) -> List[int]:
+    """PID des processus enfants directs."""
+
+    pids: List[int] = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        content = (task / "children").read_text().split()
+        pids.extend(int(child) for child in content)
+    return sorted(set(pids))
+
+
+def memory(pid: int) -> Dict[str, float]:
+    """Compteurs de ``smaps_rollup`` en Mio."""
+
+    values: Dict[str, float] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        name, _, rest = line.partition(":")
+        if name in FIELDS:
+            values[name] = int(rest.split()[0]) / 1024
+    values["Private"] = values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0)
+    return values
+
+
+def main() -> None:
+    """Point d'entrée du script."""
+
+    args = parse_args()
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("Mesure disponible uniquement sous Linux.")
+    workers = children(args.pid)
+    if not workers:
+        raise SystemExit(f"Aucun worker trouvé pour le processus {args.pid}.")
+    processes = [("master", args.pid)] + [("worker", pid) for pid in workers]
+    private_total = 0.0
+    for role, pid in processes:
+        values = memory(pid)
+        if role == "worker":
+            private_total += values["Private"]
+        print(
+            f"role={role} pid={pid} rss_mib={values['Rss']:.0f} pss_mib={values['Pss']:.0f} "
+            f"private_mib={values['Private']:.0f}"
+        )
+    print(f"workers={len(workers)} private_per_worker_mib={private_total / len(workers):.0f}")
+
+
+if __name__ == "__main__":
+    main()
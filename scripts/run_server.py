@@ -1,13 +1,145 @@
-"""Script utilitaire pour lancer le serveur FastAPI."""
+"""Script utilitaire pour lancer le serveur FastAPI.
+
+Sans option, démarre uvicorn avec rechargement automatique (développement).
+Avec ``--preload``, gunicorn importe l'application et charge les modèles dans
+le processus maître avant de créer les workers uvicorn : la mémoire des
+modèles est partagée en copie sur écriture au lieu d'être dupliquée.
+"""
 from __future__ import annotations
 
+import argparse
+import gc
+import os
+import sys
+from typing import Any, Dict
+
 import uvicorn
+from loguru import logger
+
+from config import settings
+
+APP = "src.api.main:app"
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande."""
+
+    parser = argparse.ArgumentParser(description="Serveur API LegalAssistMA")
+    parser.add_argument("--host", default="0.0.0.0", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8000, help="Port d'écoute")
+    parser.add_argument(
+        "--workers", type=int, default=settings.server.workers, help="Processus workers"
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        default=settings.server.preload,
+        help="Charge les modèles avant le fork des workers (gunicorn, Unix)",
+    )
+    parser.add_argument(
+        "--timeout", type=int, default=300, help="Délai gunicorn avant redémarrage d'un worker bloqué"
+    )
+    return parser.parse_args()
+
+
+def preload_models() -> None:
+    """Charge l'application et tous les modèles dans le processus maître.
+
+    Le ramasse-miettes est gelé ensuite: les objets chargés ne sont plus
+    parcourus par les collectes des workers, ce qui évite de recopier leurs
+    pages mémoire après le fork.
+    """
+
+    # Interroge CUDA via NVML, sans initialiser de contexte dans le maître.
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    import torch  # import local: uniquement en mode préchargement
+
+    from src.api.main import pipeline
+
+    if torch.cuda.is_available():
+        # Un contexte CUDA ne survit pas au fork: chaque worker charge alors ses modèles.
+        logger.warning("GPU détecté: préchargement désactivé, modèles chargés par chaque worker")
+        return
+    gc.disable()
+    pipeline.warmup()
+    if torch.cuda.is_initialized():
+        raise RuntimeError("CUDA initialisé pendant le préchargement, fork impossible.")
+    gc.collect()
+    gc.freeze()
+    logger.info("Modèles préchargés, %s objets gelés avant le fork", gc.get_freeze_count())
+
+
+def _enable_gc_after_fork(server: Any, worker: Any) -> None:
+    """Réactive le ramasse-miettes dans chaque worker (hook ``post_fork`` de gunicorn)."""
+
+    gc.enable()
+
+
+def _fail_dead_worker_jobs(server: Any, worker: Any) -> None:
+    """Marque en échec les tâches d'un worker disparu (hook ``child_exit`` de gunicorn).
+
+    Avec ``preload_app``, la file et son nettoyage au démarrage ne s'exécutent
+    qu'une fois, dans le maître: un worker relancé ne rattrape pas les tâches
+    restées ``running`` de son prédécesseur.
+    """
+
+    from src.api.main import job_queue
+    from src.jobs.job_queue import SQLiteJobBackend
+
+    if isinstance(job_queue.backend, SQLiteJobBackend):
+        job_queue.backend.fail_jobs_of(worker.pid)
+
+
+def run_preforked(args: argparse.Namespace) -> None:
+    """Démarre gunicorn avec des workers uvicorn et ``preload_app``."""
+
+    from gunicorn.app.base import BaseApplication  # import local: dépendance Unix
+
+    class PreforkApplication(BaseApplication):
+        """Application gunicorn chargée une seule fois dans le processus maître."""
+
+        def __init__(self, options: Dict[str, Any]) -> None:
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            preload_models()
+            from src.api.main import app
+
+            return app
+
+    PreforkApplication(
+        {
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "preload_app": True,
+            "timeout": args.timeout,
+            "post_fork": _enable_gc_after_fork,
+            "child_exit": _fail_dead_worker_jobs,
+        }
+    ).run()
 
 
 def main() -> None:
-    """Démarre l'application FastAPI avec rechargement automatique."""
+    """Point d'entrée du script."""
 
-    uvicorn.run("src.api.main:app", host="0.0.0.0", port=8000, reload=True)
+    args = parse_args()
+    if args.workers > 1 and settings.jobs.backend == "memory":
+        # Chaque worker aurait sa propre file: GET /jobs/{id} échouerait sur les autres.
+        raise SystemExit("Plusieurs workers nécessitent JOBS_BACKEND=sqlite.")
+    if args.preload:
+        if sys.platform == "win32":
+            raise SystemExit("Le mode --preload nécessite fork (Linux, macOS).")
+        run_preforked(args)
+    elif args.workers > 1:
+        uvicorn.run(APP, host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=True)
 
 
 if __name__ == "__main__":
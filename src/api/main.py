@@ -1,14 +1,24 @@
 """Entrée FastAPI pour le système LegalAssistMA."""
 from __future__ import annotations
 
+import secrets
 import tempfile
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import Depends, FastAPI, File, Header, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from loguru import logger
+from pydantic import BaseModel, Field
 
+from config import settings
+from src.jobs.job_queue import Job, JobQueue, JobStatus, QueueFullError
 from src.pipeline.main_pipeline import MainPipeline
+from src.rag.legal_rag import LegalArticle
+
+SUPPORTED_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/mpeg", "audio/ogg"}
 
 app = FastAPI(title="LegalAssistMA", version="0.1.0")
 
@@ -20,9 +30,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Instanciation légère: les modèles sont chargés par le registre du pipeline.
 pipeline = MainPipeline()
 
 
+def _run_pipeline_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Exécute le pipeline pour une tâche de la file puis supprime le fichier temporaire."""
+
+    audio_path = Path(payload["audio_path"])
+    try:
+        return pipeline.process_audio(audio_path, job_id=payload.get("job_id")).to_dict()
+    finally:
+        audio_path.unlink(missing_ok=True)
+
+
+job_queue = JobQueue(handler=_run_pipeline_job)
+
+
+async def _save_upload(file: UploadFile) -> Path:
+    """Valide le type du fichier reçu et l'écrit dans un fichier temporaire."""
+
+    if file.content_type not in SUPPORTED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Format audio non supporté.")
+    content = await file.read()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
+        tmp.write(content)
+    logger.info("Fichier reçu %s (%s octets)", file.filename, len(content))
+    return Path(tmp.name)
+
+
+def _enqueue(temp_path: Path, filename: Optional[str]) -> Job:
+    """Place le fichier dans la file bornée, ou répond 429 si elle est pleine."""
+
+    try:
+        return job_queue.submit({"audio_path": str(temp_path), "filename": filename})
+    except QueueFullError:
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=429,
+            detail="File de traitement pleine, réessayez plus tard.",
+            headers={"Retry-After": "30"},
+        )
+
+
+class ArticlePayload(BaseModel):
+    """Article de loi transmis par l'administration du corpus."""
+
+    code: str
+    article: str
+    text: str
+    category: str = ""
+    keywords: List[str] = Field(default_factory=list)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Autorise l'accès aux endpoints d'administration via l'en-tête ``X-Admin-Token``."""
+
+    expected = settings.api.admin_token
+    if not expected or not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Accès administrateur refusé.")
+
+
+class WarmupPayload(BaseModel):
+    """Composants à précharger (tous si la liste est absente)."""
+
+    components: Optional[List[str]] = None
+
+
+@app.on_event("startup")
+def warmup_models() -> None:
+    """Lance le préchargement des modèles en arrière-plan sans bloquer le démarrage."""
+
+    if settings.server.warmup_on_startup:
+        components = [
+            name.strip() for name in settings.server.warmup_components.split(",") if name.strip()
+        ]
+        pipeline.warmup(components or None, background=True)
+
+
+@app.on_event("shutdown")
+def shutdown_jobs() -> None:
+    """Arrête proprement les workers de la file de traitement et les composants chargés."""
+
+    job_queue.shutdown(wait=False)
+    pipeline.close()
+
+
 @app.get("/health")
 def health_check() -> dict[str, str]:
     """Vérifie que l'API fonctionne correctement."""
@@ -30,26 +123,97 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def readiness_check() -> JSONResponse:
+    """Indique si tous les modèles sont chargés (503 tant que ce n'est pas le cas)."""
+
+    ready = pipeline.registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "components": pipeline.registry.status()},
+    )
+
+
 @app.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...)) -> dict:
-    """Transcrit un fichier audio téléchargé et retourne le rapport complet."""
+    """Transcrit un fichier audio téléchargé et retourne le rapport complet.
 
-    if file.content_type not in {"audio/wav", "audio/x-wav", "audio/mpeg", "audio/ogg"}:
-        raise HTTPException(status_code=400, detail="Format audio non supporté.")
+    Le traitement passe par la même file bornée que ``POST /jobs`` (429 si elle
+    est pleine) ; la requête attend simplement la fin de la tâche.
+    """
 
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            temp_path = Path(tmp.name)
-        logger.info("Fichier reçu %s (%s octets)", file.filename, len(content))
-        result = pipeline.process_audio(temp_path)
-        return result.to_dict()
-    except HTTPException:
-        raise
-    except Exception as exc:  # noqa: BLE001
-        logger.exception("Erreur durant le traitement de %s: %s", file.filename, exc)
+    temp_path = await _save_upload(file)
+    job = _enqueue(temp_path, file.filename)
+    finished = await run_in_threadpool(job_queue.wait, job.job_id)
+    if finished is None or finished.status != JobStatus.SUCCEEDED:
+        logger.error(
+            "Erreur durant le traitement de %s: %s",
+            file.filename,
+            finished.error if finished is not None else "tâche introuvable",
+        )
         raise HTTPException(status_code=500, detail="Erreur interne du serveur")
-    finally:
-        if 'temp_path' in locals() and temp_path.exists():
-            temp_path.unlink(missing_ok=True)
+    return finished.result
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...)) -> dict:
+    """Place un fichier audio dans la file de traitement et retourne l'identifiant de tâche."""
+
+    temp_path = await _save_upload(file)
+    job = _enqueue(temp_path, file.filename)
+    return {"job_id": job.job_id, "status": job.status.value}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> dict:
+    """Retourne l'état et, le cas échéant, le résultat d'une tâche."""
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche introuvable.")
+    return job.to_dict()
+
+
+@app.put("/admin/articles", dependencies=[Depends(require_admin)])
+def upsert_articles(articles: List[ArticlePayload]) -> dict:
+    """Ajoute ou met à jour des articles du corpus sans reconstruire l'index."""
+
+    version = pipeline.rag.upsert_articles(
+        [LegalArticle(**article.model_dump()) for article in articles]
+    )
+    return {"updated": len(articles), "index_version": version}
+
+
+@app.get("/admin/rag/cache", dependencies=[Depends(require_admin)])
+def rag_cache_stats() -> dict:
+    """Expose les compteurs de succès/échecs des caches de recherche RAG."""
+
+    return {"index_version": pipeline.rag.version, **pipeline.rag.cache_stats()}
+
+
+@app.get("/admin/llm/cache", dependencies=[Depends(require_admin)])
+def llm_cache_stats() -> dict:
+    """Expose les compteurs du cache de réponses du LLM."""
+
+    return {"enabled": pipeline.llm.cache is not None, **pipeline.llm.cache_stats()}
+
+
+@app.post("/admin/warmup", status_code=202, dependencies=[Depends(require_admin)])
+def warmup(payload: Optional[WarmupPayload] = None) -> dict:
+    """Déclenche le préchargement en arrière-plan de tout ou partie des composants."""
+
+    components = payload.components if payload is not None else None
+    try:
+        started = pipeline.warmup(components, background=True)
+    except KeyError as exc:
+        raise HTTPException(status_code=400, detail=str(exc.args[0]))
+    return {"started": started, "components": pipeline.registry.status()}
+
+
+@app.delete("/admin/articles/{code}/{article}", dependencies=[Depends(require_admin)])
+def delete_article(code: str, article: str) -> dict:
+    """Supprime un article du corpus identifié par son code et son numéro."""
+
+    if not pipeline.rag.delete_articles([(code, article)]):
+        raise HTTPException(status_code=404, detail="Article introuvable.")
+    return {"deleted": 1, "index_version": pipeline.rag.version}
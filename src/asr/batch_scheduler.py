@@ -0,0 +1,154 @@
+"""Micro-batching des chunks Whisper provenant de plusieurs exécutions concurrentes."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+from src.asr.whisper_transcriber import TranscriptSegment, WhisperTranscriber
+
+
+@dataclass
+class _BatchItem:
+    """Chunk en attente d'un passage par lot."""
+
+    audio: np.ndarray
+    language: str
+    future: Future
+
+
+class BatchScheduler:
+    """Regroupe les chunks soumis par différents threads en lots pour Whisper.
+
+    Un thread unique possède le modèle: il attend le premier chunk, puis
+    collecte les suivants pendant au plus ``max_wait_ms`` ou jusqu'à
+    ``max_batch_size`` éléments avant de lancer ``transcribe_batch``.
+    """
+
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[int] = None,
+    ) -> None:
+        self.transcriber = transcriber
+        self.max_batch_size = max(1, max_batch_size or settings.asr.batch_size)
+        wait_ms = settings.asr.batch_max_wait_ms if max_wait_ms is None else max_wait_ms
+        self.max_wait = max(0, wait_ms) / 1000
+        self._queue: "queue.Queue[Optional[_BatchItem]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, audio: np.ndarray | Path, language: str = "ar") -> Future:
+        """Ajoute un chunk au prochain lot et retourne le futur de ses segments."""
+
+        import whisper  # import local pour accélérer le chargement global
+
+        if isinstance(audio, Path):
+            audio = whisper.load_audio(str(audio))
+        future: Future = Future()
+        if audio.shape[-1] > whisper.audio.N_SAMPLES:
+            # Seul l'appelant échoue: le lot partagé n'est pas affecté.
+            future.set_exception(
+                ValueError("Le décodage par lot est limité à des signaux de 30 s.")
+            )
+            return future
+        self._ensure_thread()
+        self._queue.put(_BatchItem(audio=audio, language=language, future=future))
+        return future
+
+    def transcribe_many(
+        self, audios: Sequence[np.ndarray | Path], language: str = "ar"
+    ) -> List[List[TranscriptSegment]]:
+        """Soumet plusieurs chunks et attend leurs résultats, dans l'ordre fourni."""
+
+        futures = [self.submit(audio, language=language) for audio in audios]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        """Arrête le thread de batching après les lots en cours."""
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_thread(self) -> None:
+        """Démarre le thread de batching à la première soumission."""
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="whisper-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Boucle de collecte et d'exécution des lots."""
+
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        # Délai écoulé: on ne prend plus que les chunks déjà en file.
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._execute(batch)
+            if stop:
+                break
+
+    def _execute(self, batch: List[_BatchItem]) -> None:
+        """Décode un lot, regroupé par langue, et résout les futurs associés."""
+
+        by_language: Dict[str, List[_BatchItem]] = {}
+        for item in batch:
+            by_language.setdefault(item.language, []).append(item)
+        for language, items in by_language.items():
+            try:
+                results = self.transcriber.transcribe_batch(
+                    [item.audio for item in items], language=language
+                )
+            except Exception as exc:  # noqa: BLE001
+                if len(items) == 1:
+                    items[0].future.set_exception(exc)
+                    continue
+                logger.warning("Échec du lot Whisper (%s), décodage chunk par chunk", exc)
+                for item in items:
+                    self._execute_single(item)
+                continue
+            for item, segments in zip(items, results):
+                item.future.set_result(segments)
+        logger.debug("Lot Whisper de %s chunks traité", len(batch))
+
+    def _execute_single(self, item: _BatchItem) -> None:
+        """Décode un chunk isolément: son erreur éventuelle ne concerne que son futur."""
+
+        try:
+            segments = self.transcriber.transcribe_batch([item.audio], language=item.language)[0]
+        except Exception as exc:  # noqa: BLE001
+            item.future.set_exception(exc)
+            return
+        item.future.set_result(segments)
@@ -0,0 +1,86 @@
+"""Transcription parallèle des chunks via un pool de processus Whisper."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+from src.asr.whisper_transcriber import TranscriptSegment, WhisperTranscriber
+
+# Modèle chargé une seule fois dans chaque processus du pool.
+_worker_transcriber: Optional[WhisperTranscriber] = None
+
+
+def _init_worker(model_size: str, torch_threads: int) -> None:
+    """Initialise un worker: limite les threads Torch et charge son propre modèle."""
+
+    global _worker_transcriber
+    import torch  # import local: exécuté uniquement dans les processus du pool
+
+    torch.set_num_threads(torch_threads)
+    _worker_transcriber = WhisperTranscriber(model_size)
+
+
+def _transcribe_in_worker(audio: Path | np.ndarray, language: str) -> List[TranscriptSegment]:
+    """Point d'entrée exécuté dans un processus du pool."""
+
+    if _worker_transcriber is None:
+        raise RuntimeError("Le worker de transcription n'a pas été initialisé.")
+    return _worker_transcriber.transcribe(audio, language=language)
+
+
+class ParallelWhisperTranscriber:
+    """Répartit la transcription des chunks sur plusieurs processus Whisper."""
+
+    def __init__(self, model_size: Optional[str] = None, workers: Optional[int] = None) -> None:
+        self.model_size = model_size or settings.models.whisper_model_size
+        self.workers = max(1, workers or settings.asr.transcription_workers)
+        self.torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, audio: Path | np.ndarray, language: str = "ar") -> Future:
+        """Soumet un chunk au pool et retourne le futur de ses segments."""
+
+        return self._get_executor().submit(_transcribe_in_worker, audio, language)
+
+    def transcribe_many(
+        self, audios: Sequence[Path | np.ndarray], language: str = "ar"
+    ) -> List[List[TranscriptSegment]]:
+        """Transcrit les chunks en parallèle et retourne les résultats dans l'ordre fourni."""
+
+        futures = [self.submit(audio, language=language) for audio in audios]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        """Arrête les processus du pool."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Crée le pool à la première utilisation (contexte ``spawn``, compatible CUDA)."""
+
+        with self._lock:
+            if self._executor is None:
+                logger.info(
+                    "Démarrage de %s workers Whisper (%s threads Torch chacun)",
+                    self.workers,
+                    self.torch_threads,
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_size, self.torch_threads),
+                )
+            return self._executor
@@ -1,12 +1,12 @@
 """Module de diarisation des locuteurs."""
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from loguru import logger
-from pyannote.audio import Pipeline
 
 from config import settings
 from src.asr.whisper_transcriber import TranscriptSegment
@@ -26,6 +26,8 @@ class SpeakerDiarizer:
     """Encapsule l'utilisation de pyannote.audio pour la diarisation."""
 
     def __init__(self, pipeline_name: Optional[str] = None) -> None:
+        from pyannote.audio import Pipeline  # import local pour accélérer le chargement global
+
         self.pipeline_name = pipeline_name or settings.models.pyannote_pipeline
         logger.info("Chargement du pipeline de diarisation %s", self.pipeline_name)
         try:
@@ -41,6 +43,16 @@ class SpeakerDiarizer:
     ) -> List[SpeakerSegment]:
         """Effectue la diarisation puis fusionne avec la transcription."""
 
+        speaker_segments = self.detect_speakers(audio_file)
+        return self._merge_transcripts(transcripts, speaker_segments)
+
+    def detect_speakers(self, audio_file: Path) -> List[tuple]:
+        """Exécute pyannote sur le fichier audio, indépendamment de la transcription.
+
+        Returns:
+            Les pistes ``(segment, piste, locuteur)`` détectées.
+        """
+
         try:
             diarization = self.pipeline(str(audio_file))
         except Exception as exc:  # noqa: BLE001
@@ -49,6 +61,15 @@ class SpeakerDiarizer:
 
         speaker_segments = list(diarization.itertracks(yield_label=True))
         logger.debug("%s segments de locuteurs détectés", len(speaker_segments))
+        return speaker_segments
+
+    def merge(
+        self,
+        transcripts: Iterable[TranscriptSegment],
+        speaker_segments: List[tuple],
+    ) -> List[SpeakerSegment]:
+        """Fusionne des pistes déjà détectées avec la transcription."""
+
         return self._merge_transcripts(transcripts, speaker_segments)
 
     def _merge_transcripts(
@@ -58,38 +79,108 @@ class SpeakerDiarizer:
     ) -> List[SpeakerSegment]:
         """Associe chaque segment de transcription au locuteur dominant."""
 
-        merged: List[SpeakerSegment] = []
-        for segment in transcripts:
-            speaker = self._find_speaker_for_segment(segment, speaker_segments)
-            merged.append(
-                SpeakerSegment(
-                    speaker=speaker,
-                    text=segment.text,
-                    start=segment.start,
-                    end=segment.end,
-                )
-            )
+        merged = assign_speakers(
+            transcripts,
+            speaker_segments,
+            split_on_speaker_change=settings.asr.split_on_speaker_change,
+        )
         logger.info("Fusion transcription/diarisation générée (%s segments)", len(merged))
         return merged
 
-    def _find_speaker_for_segment(
-        self, segment: TranscriptSegment, speaker_segments: List[tuple]
-    ) -> str:
-        """Détermine le locuteur qui recouvre le plus le segment donné."""
-
-        best_overlap = 0.0
-        best_speaker = "inconnu"
-        for (time_segment, track, label) in speaker_segments:
-            overlap = self._compute_overlap(segment, time_segment)
-            if overlap > best_overlap:
-                best_overlap = overlap
-                best_speaker = label or track
-        return str(best_speaker)
-
-    @staticmethod
-    def _compute_overlap(segment: TranscriptSegment, time_segment) -> float:
-        """Calcule la durée d'intersection entre deux segments."""
-
-        start = max(segment.start, time_segment.start)
-        end = min(segment.end, time_segment.end)
-        return max(0.0, end - start)
+
+def assign_speakers(
+    transcripts: Iterable[TranscriptSegment],
+    speaker_segments: List[tuple],
+    split_on_speaker_change: bool = False,
+) -> List[SpeakerSegment]:
+    """Attribue un locuteur à chaque segment par balayage des intervalles triés.
+
+    Les pistes pyannote sont triées par début puis parcourues une seule fois en
+    maintenant un tas des pistes actives (ordonné par fin), soit un coût en
+    O(N log N + M log M) au lieu de O(N×M). Le recouvrement est cumulé par
+    locuteur: le segment revient au locuteur dont les pistes le couvrent le plus.
+
+    Args:
+        transcripts: Segments de transcription.
+        speaker_segments: Pistes ``(segment, piste, locuteur)`` de pyannote.
+        split_on_speaker_change: Découpe un segment lorsque le locuteur change
+            en cours de segment (texte réparti au prorata de la durée).
+
+    Returns:
+        Segments attribués, dans l'ordre de la transcription.
+    """
+
+    segments = list(transcripts)
+    tracks = sorted(
+        (float(time_segment.start), float(time_segment.end), str(label or track))
+        for time_segment, track, label in speaker_segments
+    )
+    order = sorted(range(len(segments)), key=lambda position: segments[position].start)
+    assigned: List[List[SpeakerSegment]] = [[] for _ in segments]
+    active: List[Tuple[float, float, str]] = []
+    next_track = 0
+    for position in order:
+        segment = segments[position]
+        while next_track < len(tracks) and tracks[next_track][0] < segment.end:
+            start, end, label = tracks[next_track]
+            heapq.heappush(active, (end, start, label))
+            next_track += 1
+        # Les segments suivants commencent plus tard: les pistes terminées sont inutiles.
+        while active and active[0][0] <= segment.start:
+            heapq.heappop(active)
+        # Ordre chronologique des pistes: départage stable des égalités.
+        overlaps = [
+            (max(segment.start, start), min(segment.end, end), label)
+            for end, start, label in sorted(active, key=lambda item: item[1])
+            if min(segment.end, end) > max(segment.start, start)
+        ]
+        assigned[position] = _assign_segment(segment, overlaps, split_on_speaker_change)
+    return [speaker_segment for group in assigned for speaker_segment in group]
+
+
+def _assign_segment(
+    segment: TranscriptSegment,
+    overlaps: List[Tuple[float, float, str]],
+    split_on_speaker_change: bool,
+) -> List[SpeakerSegment]:
+    """Choisit le locuteur d'un segment à partir des recouvrements déjà découpés."""
+
+    totals: Dict[str, float] = {}
+    for start, end, label in overlaps:
+        totals[label] = totals.get(label, 0.0) + (end - start)
+    if not totals:
+        return [SpeakerSegment("inconnu", segment.text, segment.start, segment.end)]
+    dominant = max(totals, key=totals.__getitem__)
+    words = segment.text.split()
+    if not split_on_speaker_change or len(totals) == 1 or len(words) < 2:
+        return [SpeakerSegment(dominant, segment.text, segment.start, segment.end)]
+
+    # Chronologie des tours de parole: chaque intervalle élémentaire revient au
+    # locuteur présent le plus représenté sur l'ensemble du segment.
+    points = sorted({segment.start, segment.end, *(p for o in overlaps for p in o[:2])})
+    turns: List[List] = []
+    for left, right in zip(points, points[1:]):
+        present = [label for start, end, label in overlaps if start < right and end > left]
+        if not present:
+            continue
+        label = max(present, key=totals.__getitem__)
+        if turns and turns[-1][2] == label:
+            turns[-1][1] = right
+        else:
+            turns.append([left, right, label])
+    if len(turns) < 2:
+        return [SpeakerSegment(dominant, segment.text, segment.start, segment.end)]
+    turns[0][0] = segment.start
+    turns[-1][1] = segment.end
+
+    duration = segment.end - segment.start
+    pieces: List[SpeakerSegment] = []
+    consumed = 0
+    elapsed = 0.0
+    for start, end, label in turns:
+        elapsed += end - start
+        boundary = round(len(words) * elapsed / duration)
+        if boundary > consumed:
+            pieces.append(SpeakerSegment(label, " ".join(words[consumed:boundary]), start, end))
+            consumed = boundary
+    return pieces
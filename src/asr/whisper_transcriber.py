@@ -1,16 +1,22 @@
 """Module de transcription audio basé sur Whisper."""
 from __future__ import annotations
 
+from concurrent.futures import Future
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
-import torch
-import whisper
+import numpy as np
 from loguru import logger
 
 from config import settings
 
+# Seuils et températures de repli de ``whisper.transcribe``.
+FALLBACK_TEMPERATURES = (0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
 
 @dataclass
 class TranscriptSegment:
@@ -26,6 +32,9 @@ class WhisperTranscriber:
     """Encapsule le chargement du modèle Whisper et la transcription."""
 
     def __init__(self, model_size: Optional[str] = None) -> None:
+        import torch  # import local pour accélérer le chargement global
+        import whisper
+
         self.model_size = model_size or settings.models.whisper_model_size
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info("Chargement du modèle Whisper %s sur %s", self.model_size, self.device)
@@ -35,13 +44,23 @@ class WhisperTranscriber:
             logger.exception("Échec de chargement du modèle Whisper: %s", exc)
             raise
 
-    def transcribe(self, audio_file: Path, language: str = "ar") -> List[TranscriptSegment]:
-        """Transcrit un fichier audio et retourne les segments reconnus."""
+    def transcribe(
+        self, audio: Path | np.ndarray, language: str = "ar"
+    ) -> List[TranscriptSegment]:
+        """Transcrit un fichier audio ou un signal float32 16 kHz et retourne les segments."""
+
+        import whisper
 
         try:
-            logger.info("Transcription de %s", audio_file)
+            if isinstance(audio, np.ndarray):
+                duration = audio.shape[-1] / whisper.audio.SAMPLE_RATE
+                logger.info("Transcription d'un signal de %.1f s", duration)
+                source: str | np.ndarray = audio
+            else:
+                logger.info("Transcription de %s", audio)
+                source = str(audio)
             result = self.model.transcribe(
-                str(audio_file), language=language, fp16=self.device == "cuda"
+                source, language=language, fp16=self.device == "cuda"
             )
             segments = [
                 TranscriptSegment(
@@ -57,3 +76,162 @@ class WhisperTranscriber:
         except Exception as exc:  # noqa: BLE001
             logger.exception("Erreur durant la transcription: %s", exc)
             raise
+
+    def submit(self, audio: Path | np.ndarray, language: str = "ar") -> Future:
+        """Transcrit immédiatement et retourne un futur résolu.
+
+        Offre la même interface que les modes parallèle et par lot.
+        """
+
+        future: Future = Future()
+        try:
+            future.set_result(self.transcribe(audio, language=language))
+        except Exception as exc:  # noqa: BLE001
+            future.set_exception(exc)
+        return future
+
+    def transcribe_many(
+        self, audios: Sequence[Path | np.ndarray], language: str = "ar"
+    ) -> List[List[TranscriptSegment]]:
+        """Transcrit séquentiellement plusieurs entrées, dans l'ordre fourni."""
+
+        return [self.transcribe(audio, language=language) for audio in audios]
+
+    def transcribe_batch(
+        self, audios: Sequence[np.ndarray], language: str = "ar"
+    ) -> List[List[TranscriptSegment]]:
+        """Transcrit plusieurs signaux de 30 s maximum en un seul passage du modèle.
+
+        Le décodage conserve les tokens d'horodatage, découpés en segments comme
+        ``model.transcribe`` ; les signaux dont le décodage glouton échoue
+        (taux de compression ou log-probabilité hors seuils) sont redécodés avec
+        des températures croissantes.
+
+        Args:
+            audios: Signaux float32 mono échantillonnés à 16 kHz.
+            language: Code de langue imposé au décodeur.
+
+        Returns:
+            Une liste de segments par signal, dans l'ordre fourni.
+        """
+
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+
+        if not audios:
+            return []
+        for audio in audios:
+            if audio.shape[-1] > whisper.audio.N_SAMPLES:
+                raise ValueError("Le décodage par lot est limité à des signaux de 30 s.")
+        try:
+            logger.info("Transcription par lot de %s signaux", len(audios))
+            mel = torch.stack(
+                [
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(np.asarray(audio, dtype=np.float32)),
+                        n_mels=self.model.dims.n_mels,
+                        device=self.device,
+                    )
+                    for audio in audios
+                ]
+            )
+            results = list(self._decode(mel, language, temperature=0.0))
+            for temperature in FALLBACK_TEMPERATURES:
+                retry = [index for index, result in enumerate(results) if _needs_fallback(result)]
+                if not retry:
+                    break
+                logger.debug("Redécodage de %s signaux à T=%.1f", len(retry), temperature)
+                for index, result in zip(retry, self._decode(mel[retry], language, temperature)):
+                    results[index] = result
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Erreur durant la transcription par lot: %s", exc)
+            raise
+
+        tokenizer = get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=language,
+            task="transcribe",
+        )
+        time_precision = 2 * whisper.audio.HOP_LENGTH / whisper.audio.SAMPLE_RATE
+        batch_segments: List[List[TranscriptSegment]] = []
+        for audio, result in zip(audios, results):
+            # Même critère de silence que ``model.transcribe``.
+            is_silence = (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob < LOGPROB_THRESHOLD
+            )
+            if not result.text.strip() or is_silence:
+                batch_segments.append([])
+                continue
+            duration = audio.shape[-1] / whisper.audio.SAMPLE_RATE
+            batch_segments.append(
+                _timestamped_segments(
+                    result.tokens, tokenizer, time_precision, duration, result.avg_logprob
+                )
+            )
+        return batch_segments
+
+    def _decode(self, mel, language: str, temperature: float) -> list:
+        """Décode un lot de spectrogrammes avec horodatage, à la température donnée."""
+
+        import whisper
+
+        options = whisper.DecodingOptions(
+            language=language,
+            temperature=temperature,
+            fp16=self.device == "cuda",
+            without_timestamps=False,
+        )
+        return whisper.decode(self.model, mel, options)
+
+
+def _needs_fallback(result) -> bool:
+    """Critères de ``model.transcribe`` pour relancer le décodage à plus haute température."""
+
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return False
+    return (
+        result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+        or result.avg_logprob < LOGPROB_THRESHOLD
+    )
+
+
+def _timestamped_segments(
+    tokens: Sequence[int],
+    tokenizer,
+    time_precision: float,
+    duration: float,
+    confidence: Optional[float],
+) -> List[TranscriptSegment]:
+    """Découpe les tokens d'un résultat en segments délimités par les tokens d'horodatage."""
+
+    segments: List[TranscriptSegment] = []
+    start = 0.0
+    text_tokens: List[int] = []
+
+    def emit(end: float) -> None:
+        text = tokenizer.decode(text_tokens).strip()
+        if text:
+            segments.append(
+                TranscriptSegment(
+                    text=text,
+                    start=min(start, duration),
+                    end=min(max(end, start), duration),
+                    confidence=confidence,
+                )
+            )
+
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            time = (token - tokenizer.timestamp_begin) * time_precision
+            if text_tokens:
+                emit(time)
+                text_tokens = []
+            start = time
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        emit(duration)
+    return segments
@@ -0,0 +1,379 @@
+"""File de traitement asynchrone pour exécuter le pipeline hors de la boucle HTTP."""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from config import settings
+
+
+class JobStatus(str, Enum):
+    """États possibles d'une tâche de traitement."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Représente une demande de traitement suivie par la file."""
+
+    job_id: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.PENDING
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit la tâche en dictionnaire exposable par l'API."""
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class QueueFullError(RuntimeError):
+    """Levée lorsque la file d'attente a atteint sa capacité maximale."""
+
+
+class JobBackend(ABC):
+    """Interface de stockage de l'état des tâches."""
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """Enregistre ou met à jour une tâche."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne la tâche correspondant à l'identifiant, si elle existe."""
+
+
+class InMemoryJobBackend(JobBackend):
+    """Stockage en mémoire, limité aux tâches les plus récentes."""
+
+    def __init__(self, max_jobs: int = 1000) -> None:
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._jobs.move_to_end(job.job_id)
+            self._evict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        """Supprime les tâches terminées les plus anciennes au-delà de la limite."""
+
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+        ]
+        overflow = len(self._jobs) - self.max_jobs
+        for job_id in finished[: max(0, overflow)]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobBackend(JobBackend):
+    """Stockage persistant dans une base SQLite locale, partageable entre processus.
+
+    Chaque tâche mémorise le PID du processus qui l'exécute ; au démarrage,
+    seules les tâches non terminées dont ce processus n'existe plus sont
+    marquées en échec, sans toucher à celles des autres workers.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner_pid INTEGER
+                )
+                """
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "owner_pid" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+            self._fail_orphaned_jobs(connection)
+
+    def save(self, job: Job) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO jobs
+                    (job_id, payload, status, result, error, created_at, started_at, finished_at,
+                     owner_pid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job.job_id,
+                    json.dumps(job.payload, ensure_ascii=False),
+                    job.status.value,
+                    json.dumps(job.result, ensure_ascii=False) if job.result is not None else None,
+                    job.error,
+                    job.created_at,
+                    job.started_at,
+                    job.finished_at,
+                    os.getpid(),
+                ),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT job_id, payload, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            job_id=row[0],
+            payload=json.loads(row[1]),
+            status=JobStatus(row[2]),
+            result=json.loads(row[3]) if row[3] is not None else None,
+            error=row[4],
+            created_at=row[5],
+            started_at=row[6],
+            finished_at=row[7],
+        )
+
+    def fail_jobs_of(self, pid: int) -> int:
+        """Marque en échec les tâches non terminées du processus ``pid``, qui a disparu.
+
+        Appelé par le maître gunicorn à la mort d'un worker (hook ``child_exit``).
+
+        Returns:
+            Le nombre de tâches marquées en échec.
+        """
+
+        with self._lock, self._connect() as connection:
+            rows = connection.execute(
+                "SELECT job_id FROM jobs WHERE status IN (?, ?) AND owner_pid = ?",
+                (JobStatus.PENDING.value, JobStatus.RUNNING.value, pid),
+            ).fetchall()
+            self._mark_failed(connection, [job_id for (job_id,) in rows])
+        return len(rows)
+
+    def _fail_orphaned_jobs(self, connection: sqlite3.Connection) -> None:
+        """Marque en échec les tâches non terminées dont le processus a disparu.
+
+        Elles ne reprendront jamais ; celles des workers encore actifs sont conservées.
+        """
+
+        rows = connection.execute(
+            "SELECT job_id, owner_pid FROM jobs WHERE status IN (?, ?)",
+            (JobStatus.PENDING.value, JobStatus.RUNNING.value),
+        ).fetchall()
+        self._mark_failed(
+            connection, [job_id for job_id, owner_pid in rows if not _process_alive(owner_pid)]
+        )
+
+    @staticmethod
+    def _mark_failed(connection: sqlite3.Connection, job_ids: List[str]) -> None:
+        """Passe les tâches interrompues à l'état ``failed``."""
+
+        if not job_ids:
+            return
+        finished_at = time.time()
+        connection.executemany(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            [
+                (
+                    JobStatus.FAILED.value,
+                    "Traitement interrompu par un redémarrage du serveur.",
+                    finished_at,
+                    job_id,
+                )
+                for job_id in job_ids
+            ],
+        )
+        logger.warning("%s tâches interrompues marquées en échec", len(job_ids))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion courte, utilisable depuis n'importe quel thread."""
+
+        return sqlite3.connect(self.db_path, timeout=30)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Indique si le processus ``pid`` existe encore (hors processus courant)."""
+
+    # Le processus courant démarre: il ne peut pas encore posséder de tâche.
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def create_backend(name: Optional[str] = None) -> JobBackend:
+    """Instancie le backend de stockage configuré (``memory`` ou ``sqlite``)."""
+
+    name = (name or settings.jobs.backend).lower()
+    if name == "memory":
+        return InMemoryJobBackend()
+    if name == "sqlite":
+        return SQLiteJobBackend(settings.jobs.sqlite_path)
+    raise ValueError(f"Backend de tâches inconnu: {name}")
+
+
+class JobQueue:
+    """Pool borné de workers exécutant les tâches soumises en arrière-plan."""
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+        backend: Optional[JobBackend] = None,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+    ) -> None:
+        self.handler = handler
+        self.backend = backend or create_backend()
+        self.max_workers = max(1, max_workers or settings.jobs.max_workers)
+        self.max_queue_size = max(
+            0, settings.jobs.max_queue_size if max_queue_size is None else max_queue_size
+        )
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue_size)
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Signal de fin des tâches soumises par ce processus, pour ``wait``.
+        self._done: Dict[str, threading.Event] = {}
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        """Ajoute une tâche à la file ou lève ``QueueFullError`` si elle est pleine."""
+
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("La file de traitement est pleine.")
+        self._ensure_workers()
+        job_id = uuid.uuid4().hex
+        job = Job(job_id=job_id, payload={**payload, "job_id": job_id})
+        self.backend.save(job)
+        with self._lock:
+            self._done[job_id] = threading.Event()
+        self._queue.put(job)
+        logger.info("Tâche %s ajoutée à la file (%s en attente)", job.job_id, self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne l'état courant d'une tâche."""
+
+        return self.backend.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Attend la fin d'une tâche soumise par ce processus et retourne son état final.
+
+        Retourne l'état courant si ``timeout`` expire avant la fin de la tâche.
+        """
+
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        return self.backend.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Expose l'occupation de la file pour la supervision."""
+
+        return {
+            "workers": self.max_workers,
+            "capacity": self.max_workers + self.max_queue_size,
+            "queued": self._queue.qsize(),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête les workers après la fin des tâches en cours."""
+
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _ensure_workers(self) -> None:
+        """Démarre les threads à la première soumission (compatible avec un fork)."""
+
+        with self._lock:
+            if self._workers:
+                return
+            for index in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop, name=f"job-worker-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        """Boucle principale d'un worker: consomme et exécute les tâches."""
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            self.backend.save(job)
+            try:
+                job.result = self.handler(job.payload)
+                job.status = JobStatus.SUCCEEDED
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Échec de la tâche %s: %s", job.job_id, exc)
+                job.status = JobStatus.FAILED
+                job.error = str(exc)
+            finally:
+                job.finished_at = time.time()
+                self.backend.save(job)
+                self._slots.release()
+                with self._lock:
+                    done = self._done.pop(job.job_id, None)
+                if done is not None:
+                    done.set()
@@ -0,0 +1,130 @@
+"""Classification rapide des affaires par similarité avec des descriptions de catégories."""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+# Descriptions servant de prototypes: la moyenne de leurs embeddings représente la catégorie.
+LABEL_DESCRIPTIONS: Dict[str, List[str]] = {
+    "penal": [
+        "affaire pénale: vol, agression, coups et blessures, violence, escroquerie",
+        "l'accusé est poursuivi par le parquet pour un crime ou un délit",
+        "plainte, garde à vue, détention, peine de prison, amende pénale",
+        "قضية جنائية: سرقة، ضرب وجرح، عنف، نصب واحتيال",
+        "المتهم متابع من طرف النيابة العامة",
+    ],
+    "civil": [
+        "litige civil: contrat, dette, responsabilité civile, dommages et intérêts",
+        "propriété immobilière, bail, loyer impayé, expulsion du locataire",
+        "exécution d'un jugement civil, créance, obligation contractuelle",
+        "نزاع مدني: عقد، دين، تعويض عن الضرر، كراء",
+    ],
+    "famille": [
+        "droit de la famille: divorce, mariage, garde des enfants, pension alimentaire",
+        "Moudawana, succession, héritage, filiation, tutelle",
+        "قضية أسرية: طلاق، زواج، حضانة الأطفال، نفقة، إرث",
+    ],
+    "travail": [
+        "droit du travail: licenciement abusif, salaire impayé, contrat de travail",
+        "employeur et salarié, indemnité de licenciement, accident du travail, CNSS",
+        "نزاع الشغل: طرد تعسفي، الأجرة، المشغل والأجير، حادثة شغل",
+    ],
+}
+
+# Texte des documents découpé en passages d'environ cette taille avant encodage.
+PASSAGE_CHARACTERS = 400
+
+
+class EmbeddingCaseClassifier:
+    """Compare l'embedding moyen d'un document aux prototypes de chaque catégorie.
+
+    Les prototypes sont calculés une seule fois ; classer un document ne coûte
+    qu'un encodage de ses passages et un produit matriciel.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        labels: Sequence[str],
+        descriptions: Optional[Dict[str, List[str]]] = None,
+        temperature: float = 0.05,
+    ) -> None:
+        self.encoder = encoder
+        self.labels = list(labels)
+        self.temperature = temperature
+        descriptions = descriptions or LABEL_DESCRIPTIONS
+        prototypes = []
+        for label in self.labels:
+            phrases = descriptions.get(label) or [label]
+            vectors = self._encode(phrases)
+            prototypes.append(vectors.mean(axis=0))
+        self.prototypes = self._normalize(np.stack(prototypes))
+        logger.info("Prototypes de classification calculés pour %s catégories", len(self.labels))
+
+    def classify_many(self, texts: Sequence[str]) -> List[Tuple[str, Dict[str, float], float]]:
+        """Retourne (catégorie, scores par catégorie, confiance) pour chaque texte.
+
+        La confiance est la probabilité de la catégorie retenue après softmax
+        des similarités cosinus.
+        """
+
+        passages: List[str] = []
+        owners: List[int] = []
+        for position, text in enumerate(texts):
+            for passage in split_passages(text) or [text]:
+                passages.append(passage)
+                owners.append(position)
+        if not passages:
+            return []
+        vectors = self._encode(passages)
+        documents = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+        np.add.at(documents, np.asarray(owners), vectors)
+        similarities = self._normalize(documents) @ self.prototypes.T
+
+        logits = similarities / self.temperature
+        probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        results = []
+        for row in probabilities:
+            ranked = np.argsort(-row, kind="stable")
+            scores = {self.labels[index]: float(row[index]) for index in ranked}
+            results.append((self.labels[ranked[0]], scores, float(row[ranked[0]])))
+        return results
+
+    def _encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode les textes en un lot de vecteurs float32 normalisés."""
+
+        vectors = self.encoder.encode(list(texts), normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Ramène chaque ligne à une norme unitaire (lignes nulles inchangées)."""
+
+        return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def split_passages(text: str, max_characters: int = PASSAGE_CHARACTERS) -> List[str]:
+    """Regroupe les lignes ou phrases d'un texte en passages de taille bornée."""
+
+    pieces = [piece.strip() for piece in re.split(r"(?<=[.!?؟])\s+|\n+", text) if piece.strip()]
+    passages: List[str] = []
+    current = ""
+    for piece in pieces:
+        while len(piece) > max_characters:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(piece[:max_characters])
+            piece = piece[max_characters:]
+        if current and len(current) + len(piece) + 1 > max_characters:
+            passages.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}".strip()
+    if current:
+        passages.append(current)
+    return passages
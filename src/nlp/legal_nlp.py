@@ -1,14 +1,23 @@
 """Module NLP juridique pour LegalAssistMA."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Sequence
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-import spacy
 from loguru import logger
-from transformers import Pipeline, pipeline
 
 from config import settings
+from src.nlp.embedding_classifier import EmbeddingCaseClassifier
+from src.nlp.windowing import TextWindow, aggregate_scores, token_windows, window_budget
+
+if TYPE_CHECKING:
+    import spacy
+    from transformers import Pipeline
+
+CLASSIFICATION_MODES = ("zero_shot", "embedding", "hybrid")
+# Tokens réservés à l'hypothèse ("This example is {}.") dans les fenêtres zero-shot.
+ZERO_SHOT_HYPOTHESIS_TOKENS = 16
 
 
 @dataclass
@@ -21,6 +30,16 @@ class EntityResult:
     end: int
 
 
+@dataclass
+class WindowScore:
+    """Sentiment d'une fenêtre du texte analysé (positions en caractères)."""
+
+    start: int
+    end: int
+    sentiment: str
+    sentiment_score: float
+
+
 @dataclass
 class NLPReport:
     """Rassemble les résultats NLP pour un segment ou un document."""
@@ -31,12 +50,26 @@ class NLPReport:
     category: str
     category_scores: Dict[str, float]
     keywords: List[str]
+    windows: List[WindowScore] = field(default_factory=list)
+    speaker_sentiments: Dict[str, Dict[str, float]] = field(default_factory=dict)
 
 
 class LegalNLPProcessor:
     """Enveloppe des fonctionnalités NLP adaptées au contexte juridique marocain."""
 
-    def __init__(self) -> None:
+    def __init__(self, encoder=None, encoder_factory: Optional[Callable[[], Any]] = None) -> None:
+        """Initialise les modèles NLP.
+
+        Args:
+            encoder: Encodeur de phrases (``encode(texts, normalize_embeddings=True)``)
+                utilisé par la classification par embeddings.
+            encoder_factory: Fonction retournant l'encodeur, appelée seulement au
+                premier usage du classifieur par embeddings (typiquement le
+                modèle du RAG) ; à défaut, un encodeur est chargé à la demande.
+        """
+
+        import spacy  # import local pour accélérer le chargement global
+
         logger.info("Chargement du modèle spaCy %s", settings.models.spacy_model)
         self.spacy_nlp = spacy.load(settings.models.spacy_model)
         self.sentiment_model_name = "akhooli/bert-base-arabic-camelbert-da-sentiment"
@@ -44,49 +77,223 @@ class LegalNLPProcessor:
         self.sentiment_analyzer = self._create_pipeline(
             "sentiment-analysis", self.sentiment_model_name
         )
-        self.classifier = self._create_pipeline(
-            "zero-shot-classification", self.zero_shot_model_name
-        )
         self.legal_labels = ["penal", "civil", "famille", "travail"]
+        self.classification_mode = settings.nlp.classification_mode
+        if self.classification_mode not in CLASSIFICATION_MODES:
+            raise ValueError(f"Mode de classification inconnu: {self.classification_mode}")
+        self._encoder = encoder
+        self._encoder_factory = encoder_factory
+        self._classifier: Optional[Pipeline] = None
+        self._embedding_classifier: Optional[EmbeddingCaseClassifier] = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def classifier(self) -> Pipeline:
+        """Pipeline zero-shot, chargé seulement lorsqu'il est réellement sollicité."""
+
+        with self._model_lock:
+            if self._classifier is None:
+                self._classifier = self._create_pipeline(
+                    "zero-shot-classification", self.zero_shot_model_name
+                )
+            return self._classifier
+
+    @property
+    def embedding_classifier(self) -> EmbeddingCaseClassifier:
+        """Classifieur par prototypes d'embeddings, construit au premier usage."""
+
+        with self._model_lock:
+            if self._embedding_classifier is None:
+                if self._encoder is None and self._encoder_factory is not None:
+                    self._encoder = self._encoder_factory()
+                if self._encoder is None:
+                    from src.rag.embedding_backend import load_encoder
+
+                    self._encoder = load_encoder()
+                self._embedding_classifier = EmbeddingCaseClassifier(
+                    self._encoder, self.legal_labels
+                )
+            return self._embedding_classifier
+
+    def analyse(self, text: str, speaker_texts: Optional[Dict[str, str]] = None) -> NLPReport:
+        """Produit un rapport NLP complet pour un texte donné.
+
+        Args:
+            text: Texte à analyser.
+            speaker_texts: Propos de chaque locuteur, pour un sentiment par locuteur.
+        """
+
+        return self.analyse_many([text], n_process=1, speaker_texts=[speaker_texts or {}])[0]
+
+    def analyse_many(
+        self,
+        texts: Sequence[str],
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+        speaker_texts: Optional[Sequence[Dict[str, str]]] = None,
+    ) -> List[NLPReport]:
+        """Analyse plusieurs textes en lots (spaCy ``pipe`` et pipelines Transformers batchés).
 
-    def analyse(self, text: str) -> NLPReport:
-        """Produit un rapport NLP complet pour un texte donné."""
+        Avec ``NLP_WINDOWED_ANALYSIS``, le sentiment et la classification
+        zero-shot sont calculés sur des fenêtres glissantes de tokens, toutes
+        traitées dans le même lot, puis agrégés au niveau du document.
 
-        doc = self.spacy_nlp(text)
-        entities = [
-            EntityResult(ent.text, ent.label_, int(ent.start_char), int(ent.end_char))
-            for ent in doc.ents
+        Args:
+            texts: Textes à analyser.
+            batch_size: Taille des lots, par défaut ``NLP_BATCH_SIZE``.
+            n_process: Processus spaCy, par défaut ``NLP_SPACY_PROCESSES``.
+            speaker_texts: Pour chaque texte, les propos de chaque locuteur.
+
+        Returns:
+            Un rapport par texte, identique à celui de ``analyse``.
+        """
+
+        texts = list(texts)
+        if not texts:
+            return []
+        batch_size = batch_size or settings.nlp.batch_size
+        n_process = n_process or settings.nlp.spacy_processes
+        speaker_texts = list(speaker_texts or [{} for _ in texts])
+        docs = list(self.spacy_nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+
+        # Documents et locuteurs partagent un seul passage du modèle de sentiment.
+        speaker_keys = [
+            (position, speaker)
+            for position, speakers in enumerate(speaker_texts)
+            for speaker in speakers
         ]
-        sentiment_label, sentiment_score = self._analyse_sentiment(text)
-        category, category_scores = self._classify_case(text)
-        keywords = self._extract_keywords(doc)
-        return NLPReport(
-            entities=entities,
-            sentiment=sentiment_label,
-            sentiment_score=sentiment_score,
-            category=category,
-            category_scores=category_scores,
-            keywords=keywords,
+        sentiment_inputs = texts + [
+            speaker_texts[position][speaker] for position, speaker in speaker_keys
+        ]
+        sentiments = self._analyse_sentiments(sentiment_inputs, batch_size)
+        speaker_sentiments: List[Dict[str, Dict[str, float]]] = [{} for _ in texts]
+        for (position, speaker), (scores, _) in zip(speaker_keys, sentiments[len(texts) :]):
+            speaker_sentiments[position][speaker] = scores
+
+        classifications = self.classify_cases(texts, batch_size)
+        reports = []
+        for position, (doc, (category, category_scores)) in enumerate(zip(docs, classifications)):
+            scores, windows = sentiments[position]
+            sentiment_label, sentiment_score = next(iter(scores.items()), ("", 0.0))
+            logger.debug("Sentiment détecté: %s (%.2f)", sentiment_label, sentiment_score)
+            reports.append(
+                NLPReport(
+                    entities=[
+                        EntityResult(ent.text, ent.label_, int(ent.start_char), int(ent.end_char))
+                        for ent in doc.ents
+                    ],
+                    sentiment=sentiment_label,
+                    sentiment_score=sentiment_score,
+                    category=category,
+                    category_scores=category_scores,
+                    keywords=self._extract_keywords(doc),
+                    windows=windows if len(windows) > 1 else [],
+                    speaker_sentiments=speaker_sentiments[position],
+                )
+            )
+        logger.debug("%s textes analysés par lots de %s", len(texts), batch_size)
+        return reports
+
+    def _analyse_sentiments(
+        self, texts: List[str], batch_size: int
+    ) -> List[Tuple[Dict[str, float], List[WindowScore]]]:
+        """Distribution des sentiments de chaque texte et détail par fenêtre.
+
+        Les scores de toutes les classes sont demandés (``top_k=None``) afin
+        d'agréger les fenêtres par moyenne pondérée.
+        """
+
+        windows = self._windows(texts, self.sentiment_analyzer.tokenizer)
+        flat = [window for text_windows in windows for window in text_windows]
+        outputs = self.sentiment_analyzer(
+            [window.text for window in flat], batch_size=batch_size, top_k=None, truncation=True
         )
+        window_scores = [
+            {result["label"].lower(): float(result["score"]) for result in output}
+            for output in outputs
+        ]
+        results = []
+        offset = 0
+        for text_windows in windows:
+            scores = window_scores[offset : offset + len(text_windows)]
+            offset += len(text_windows)
+            details = [
+                WindowScore(window.start, window.end, *max(score.items(), key=lambda item: item[1]))
+                for window, score in zip(text_windows, scores)
+            ]
+            results.append((aggregate_scores(scores, text_windows), details))
+        return results
 
-    def _analyse_sentiment(self, text: str) -> tuple[str, float]:
-        """Retourne le sentiment dominant et son score associé."""
+    def _windows(
+        self, texts: List[str], tokenizer, reserved_tokens: int = 0
+    ) -> List[List[TextWindow]]:
+        """Fenêtres de chaque texte, ou le texte entier si le fenêtrage est désactivé."""
 
-        result = self.sentiment_analyzer(text)[0]
-        label = result["label"].lower()
-        score = float(result["score"])
-        logger.debug("Sentiment détecté: %s (%.2f)", label, score)
-        return label, score
+        if not settings.nlp.windowed_analysis:
+            return [[TextWindow(text, 0, len(text), 1)] for text in texts]
+        max_tokens = window_budget(tokenizer, settings.nlp.window_tokens, reserved_tokens)
+        overlap = min(settings.nlp.window_overlap_tokens, max_tokens // 2)
+        return [token_windows(text, tokenizer, max_tokens, overlap) for text in texts]
 
-    def _classify_case(self, text: str) -> tuple[str, Dict[str, float]]:
-        """Classe l'affaire parmi les catégories juridiques définies."""
+    def classify_cases(
+        self, texts: List[str], batch_size: Optional[int] = None, mode: Optional[str] = None
+    ) -> List[tuple[str, Dict[str, float]]]:
+        """Classe chaque affaire selon ``mode`` (par défaut ``NLP_CLASSIFICATION_MODE``).
 
-        result = self.classifier(text, candidate_labels=self.legal_labels)
-        scores = {
-            label: float(score) for label, score in zip(result["labels"], result["scores"])
-        }
-        logger.debug("Catégorie prédominante: %s", result["labels"][0])
-        return result["labels"][0], scores
+        En mode ``hybrid``, le classifieur par embeddings décide seul lorsque sa
+        confiance atteint ``NLP_CLASSIFICATION_MIN_CONFIDENCE`` ; seuls les autres
+        textes passent par le modèle zero-shot.
+        """
+
+        mode = mode or self.classification_mode
+        batch_size = batch_size or settings.nlp.batch_size
+        if mode == "zero_shot":
+            return self._classify_zero_shot(texts, batch_size)
+        predictions = self.embedding_classifier.classify_many(texts)
+        classifications = [(label, scores) for label, scores, _ in predictions]
+        if mode == "embedding":
+            return classifications
+        threshold = settings.nlp.classification_min_confidence
+        uncertain = [
+            position
+            for position, (_, _, confidence) in enumerate(predictions)
+            if confidence < threshold
+        ]
+        if uncertain:
+            logger.debug("%s textes incertains transmis au zero-shot", len(uncertain))
+            fallback = self._classify_zero_shot(
+                [texts[position] for position in uncertain], batch_size
+            )
+            for position, result in zip(uncertain, fallback):
+                classifications[position] = result
+        return classifications
+
+    def _classify_zero_shot(
+        self, texts: List[str], batch_size: int
+    ) -> List[tuple[str, Dict[str, float]]]:
+        """Classe les textes avec le modèle NLI zero-shot (une passe par catégorie)."""
+
+        classifier = self.classifier
+        windows = self._windows(texts, classifier.tokenizer, ZERO_SHOT_HYPOTHESIS_TOKENS)
+        flat = [window.text for text_windows in windows for window in text_windows]
+        results = classifier(flat, candidate_labels=self.legal_labels, batch_size=batch_size)
+        if isinstance(results, dict):
+            results = [results]
+        window_scores = [
+            {label: float(score) for label, score in zip(result["labels"], result["scores"])}
+            for result in results
+        ]
+        classifications = []
+        offset = 0
+        for text_windows in windows:
+            scores = aggregate_scores(
+                window_scores[offset : offset + len(text_windows)], text_windows
+            )
+            offset += len(text_windows)
+            category = next(iter(scores))
+            logger.debug("Catégorie prédominante: %s", category)
+            classifications.append((category, scores))
+        return classifications
 
     def _extract_keywords(self, doc: spacy.tokens.Doc, max_keywords: int = 12) -> List[str]:
         """Extrait des mots-clés basés sur la morphologie et la fréquence."""
@@ -108,6 +315,8 @@ class LegalNLPProcessor:
     def _create_pipeline(self, task: str, model_name: str) -> Pipeline:
         """Construit un pipeline Transformers avec gestion des erreurs."""
 
+        from transformers import pipeline  # import local pour accélérer le chargement global
+
         try:
             return pipeline(
                 task,
@@ -120,8 +329,23 @@ class LegalNLPProcessor:
             raise
 
 
-def batch_analyse(texts: Sequence[str]) -> List[NLPReport]:
-    """Analyse plusieurs textes et retourne les rapports correspondants."""
+_shared_processor: Optional[LegalNLPProcessor] = None
+_shared_processor_lock = threading.Lock()
+
+
+def get_processor() -> LegalNLPProcessor:
+    """Retourne le processeur partagé, chargé une seule fois par processus."""
+
+    global _shared_processor
+    with _shared_processor_lock:
+        if _shared_processor is None:
+            _shared_processor = LegalNLPProcessor()
+        return _shared_processor
+
+
+def batch_analyse(
+    texts: Sequence[str], processor: Optional[LegalNLPProcessor] = None
+) -> List[NLPReport]:
+    """Analyse plusieurs textes par lots et retourne les rapports correspondants."""
 
-    processor = LegalNLPProcessor()
-    return [processor.analyse(text) for text in texts]
+    return (processor or get_processor()).analyse_many(texts)
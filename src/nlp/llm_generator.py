@@ -1,16 +1,43 @@
 """Générateur de résumés et recommandations via l'API OpenAI."""
 from __future__ import annotations
 
+import asyncio
+import random
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import httpx
 from loguru import logger
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
 
 from config import settings
 from src.asr.speaker_diarizer import SpeakerSegment
+from src.nlp.llm_cache import LLMCache
+from src.nlp.prompt_builder import PromptBuilder, TokenCounter
+from src.nlp.rate_limit import AsyncTokenBucket, EventLoopThread
 from src.rag.legal_rag import LegalArticle
 
+SYSTEM_PROMPT = (
+    "Tu es un assistant juridique spécialisé dans le droit marocain. "
+    "Fourni des réponses structurées, factuelles et prudentes."
+)
+MAP_PROMPT = (
+    "Résume fidèlement cet extrait d'audience (partie {index}/{total}) en puces courtes : "
+    "faits, parties, déclarations clés, preuves, décisions. Conserve les noms des "
+    "locuteurs et les horodatages utiles, sans interprétation.\n\n{text}"
+)
+TEMPERATURE = 0.2
+# Erreurs transitoires donnant lieu à un nouvel essai.
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+# Nombre maximal de niveaux de résumés imbriqués avant troncature.
+MAX_REDUCE_LEVELS = 3
+
 
 @dataclass
 class LLMResult:
@@ -21,68 +48,257 @@ class LLMResult:
 
 
 class LLMGenerator:
-    """Interagit avec GPT-3.5-turbo pour créer un rapport juridique exploitable."""
+    """Interagit avec le modèle de chat pour créer un rapport juridique exploitable.
+
+    Les appels passent par un client ``AsyncOpenAI`` exécuté sur une boucle
+    asyncio dédiée: toutes les exécutions du pipeline partagent son pool de
+    connexions HTTP, son sémaphore de concurrence et ses seaux à jetons.
+    """
 
-    def __init__(self, model_name: str = "gpt-3.5-turbo") -> None:
+    def __init__(self, model_name: Optional[str] = None) -> None:
         if not settings.api.openai_api_key:
             raise ValueError("La clé API OpenAI est requise pour utiliser le LLM.")
-        self.client = OpenAI(api_key=settings.api.openai_api_key)
-        self.model_name = model_name
+        self.model_name = model_name or settings.llm.model
+        self.prompt_builder = PromptBuilder(
+            TokenCounter(self.model_name), settings.llm.prompt_token_budget
+        )
+        self.cache: Optional[LLMCache] = None
+        if settings.llm.cache_enabled:
+            self.cache = LLMCache(
+                settings.llm.cache_path,
+                max_entries=settings.llm.cache_max_entries,
+                max_age_seconds=settings.llm.cache_max_age_days * 86400,
+            )
+        self._loop = EventLoopThread("llm-event-loop")
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._request_bucket = AsyncTokenBucket(
+            settings.llm.requests_per_minute / 60, settings.llm.requests_per_minute
+        )
+        self._token_bucket = AsyncTokenBucket(
+            settings.llm.tokens_per_minute / 60, settings.llm.tokens_per_minute
+        )
 
     def build_report(
         self,
         transcript: List[SpeakerSegment],
         legal_articles: List[LegalArticle],
         nlp_summary: str,
+        use_cache: bool = True,
+    ) -> LLMResult:
+        """Génère un résumé global et des recommandations détaillées.
+
+        Si le prompt dépasse ``LLM_PROMPT_TOKEN_BUDGET``, le transcript est
+        découpé en fenêtres résumées en parallèle (map), puis le rapport final
+        est produit à partir de ces synthèses (reduce).
+
+        Args:
+            use_cache: ``False`` force l'appel à l'API sans lire le cache
+                (la nouvelle réponse y est tout de même enregistrée).
+        """
+
+        return self._loop.run(
+            self._build_report(transcript, legal_articles, nlp_summary, use_cache)
+        )
+
+    async def build_report_async(
+        self,
+        transcript: List[SpeakerSegment],
+        legal_articles: List[LegalArticle],
+        nlp_summary: str,
+        use_cache: bool = True,
     ) -> LLMResult:
-        """Génère un résumé global et des recommandations détaillées."""
+        """Version asynchrone de ``build_report``, pour les appelants asynchrones.
+
+        Le travail est exécuté sur la boucle dédiée et attendu depuis la boucle
+        de l'appelant: le client HTTP, le sémaphore et les seaux à jetons, liés
+        à la boucle qui les a créés, ne sont jamais utilisés depuis une autre.
+        """
 
-        prompt = self._compose_prompt(transcript, legal_articles, nlp_summary)
+        return await asyncio.wrap_future(
+            self._loop.submit(
+                self._build_report(transcript, legal_articles, nlp_summary, use_cache)
+            )
+        )
+
+    async def _build_report(
+        self,
+        transcript: List[SpeakerSegment],
+        legal_articles: List[LegalArticle],
+        nlp_summary: str,
+        use_cache: bool,
+    ) -> LLMResult:
+        """Compose le prompt et interroge le modèle (exécuté sur la boucle dédiée)."""
+
+        prompt = await self._compose_prompt(transcript, legal_articles, nlp_summary, use_cache)
         logger.info("Requête au modèle %s pour la génération de rapport", self.model_name)
-        completion = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "Tu es un assistant juridique spécialisé dans le droit marocain. "
-                        "Fourni des réponses structurées, factuelles et prudentes."
-                    ),
-                },
+        message = await self._achat(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.2,
-            max_tokens=800,
+            max_tokens=settings.llm.max_tokens,
+            use_cache=use_cache,
         )
-        message = completion.choices[0].message.content
         summary, recommendations = self._post_process(message)
         return LLMResult(summary=summary, recommendations=recommendations)
 
-    def _compose_prompt(
+    def cache_stats(self) -> Dict[str, float]:
+        """Compteurs du cache de réponses (vide si le cache est désactivé)."""
+
+        return self.cache.stats() if self.cache is not None else {}
+
+    def close(self) -> None:
+        """Ferme le client HTTP et arrête la boucle dédiée."""
+
+        if self._client is not None:
+            self._loop.run(self._client.close())
+            self._client = None
+        self._loop.stop()
+
+    async def _achat(
+        self, messages: List[Dict[str, str]], max_tokens: int, use_cache: bool = True
+    ) -> str:
+        """Point d'appel unique de l'API de chat, servi par le cache si possible.
+
+        Les appels sont bornés par ``LLM_MAX_CONCURRENCY``, régulés par les
+        seaux à jetons (requêtes et tokens par minute) et réessayés avec un
+        backoff exponentiel à gigue sur les erreurs transitoires.
+        """
+
+        key = None
+        if self.cache is not None:
+            key = LLMCache.make_key(self.model_name, TEMPERATURE, messages, max_tokens)
+            cached = await asyncio.to_thread(self.cache.get, key) if use_cache else None
+            if cached is not None:
+                logger.debug("Réponse LLM servie par le cache")
+                return cached
+
+        client, semaphore = self._async_resources()
+        estimated_tokens = max_tokens + sum(
+            self.prompt_builder.counter.count(message["content"]) for message in messages
+        )
+        attempts = settings.llm.max_retries + 1
+        for attempt in range(attempts):
+            try:
+                async with semaphore:
+                    await self._request_bucket.acquire()
+                    await self._token_bucket.acquire(estimated_tokens)
+                    completion = await client.chat.completions.create(
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=TEMPERATURE,
+                        max_tokens=max_tokens,
+                    )
+                break
+            except RETRYABLE_ERRORS as exc:
+                if attempt + 1 >= attempts:
+                    raise
+                delay = self._retry_delay(attempt, exc)
+                logger.warning(
+                    "Appel LLM échoué (%s), nouvel essai %s/%s dans %.1f s",
+                    type(exc).__name__,
+                    attempt + 1,
+                    attempts - 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+        message = completion.choices[0].message.content or ""
+        if key is not None and message:
+            await asyncio.to_thread(self.cache.put, key, self.model_name, message)
+        return message
+
+    def _async_resources(self) -> tuple[AsyncOpenAI, asyncio.Semaphore]:
+        """Client et sémaphore, créés sur la boucle dédiée lors du premier appel."""
+
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm.max_concurrency,
+                    max_keepalive_connections=settings.llm.max_concurrency,
+                ),
+                timeout=httpx.Timeout(settings.llm.timeout_seconds, connect=10.0),
+            )
+            self._client = AsyncOpenAI(
+                api_key=settings.api.openai_api_key,
+                base_url=settings.llm.base_url or None,
+                http_client=http_client,
+                max_retries=0,
+            )
+            self._semaphore = asyncio.Semaphore(settings.llm.max_concurrency)
+        return self._client, self._semaphore
+
+    @staticmethod
+    def _retry_delay(attempt: int, exc: Exception) -> float:
+        """Backoff exponentiel à gigue complète, ou délai ``Retry-After`` du serveur."""
+
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.llm.backoff_max_seconds)
+            except ValueError:
+                pass
+        ceiling = min(
+            settings.llm.backoff_max_seconds, settings.llm.backoff_base_seconds * 2**attempt
+        )
+        return random.uniform(0, ceiling)
+
+    async def _compose_prompt(
         self,
         transcript: List[SpeakerSegment],
         legal_articles: List[LegalArticle],
         nlp_summary: str,
+        use_cache: bool = True,
     ) -> str:
-        """Assemble les différentes informations pour un prompt cohérent."""
+        """Assemble le prompt en respectant le budget de tokens."""
 
-        transcript_text = "\n".join(
-            f"[{segment.start:.2f}-{segment.end:.2f}] {segment.speaker}: {segment.text}"
-            for segment in transcript
-        )
-        articles_text = "\n".join(
-            f"Article {article.article} ({article.code}) - {article.text[:400]}..."
-            for article in legal_articles
+        builder = self.prompt_builder
+        articles_text = builder.articles_text(legal_articles)
+        lines = builder.transcript_lines(transcript)
+        prompt = builder.compose("\n".join(lines), articles_text, nlp_summary)
+        if builder.fits(prompt):
+            return prompt
+
+        available = builder.transcript_budget(articles_text, nlp_summary)
+        logger.info(
+            "Prompt de %s tokens au-delà du budget (%s), résumé par fenêtres",
+            builder.counter.count(prompt),
+            builder.token_budget,
         )
-        prompt = (
-            "Contexte NLP:\n" + nlp_summary + "\n\n"
-            "Transcription diarisée:\n" + transcript_text + "\n\n"
-            "Articles pertinents:\n" + articles_text + "\n\n"
-            "1. Fournis un résumé structuré en 5 puces max (faits, parties, décisions, preuves, ton).\n"
-            "2. Fournis 3 recommandations juridiques pratiques avec estimation de confiance (faible/moyenne/haute).\n"
-            "3. Signale les incertitudes ou données manquantes."
+        parts = lines
+        for _ in range(MAX_REDUCE_LEVELS):
+            parts = await self._summarize_windows(parts, use_cache)
+            summaries_text = "\n\n".join(parts)
+            if builder.counter.count(summaries_text) <= available or len(parts) == 1:
+                break
+        summaries_text = builder.counter.truncate(summaries_text, available)
+        return builder.compose(summaries_text, articles_text, nlp_summary, summarized=True)
+
+    async def _summarize_windows(self, parts: List[str], use_cache: bool = True) -> List[str]:
+        """Résume en parallèle des fenêtres de ``LLM_MAP_WINDOW_TOKENS`` tokens (étape map)."""
+
+        windows = self.prompt_builder.split_windows(parts, settings.llm.map_window_tokens)
+        logger.info("Résumé de %s fenêtres de transcript", len(windows))
+        summaries = await asyncio.gather(
+            *(
+                self._achat(
+                    [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {
+                            "role": "user",
+                            "content": MAP_PROMPT.format(
+                                index=index, total=len(windows), text=text
+                            ),
+                        },
+                    ],
+                    max_tokens=settings.llm.map_max_tokens,
+                    use_cache=use_cache,
+                )
+                for index, text in enumerate(windows, start=1)
+            )
         )
-        return prompt
+        return [f"Partie {index}:\n{summary}" for index, summary in enumerate(summaries, start=1)]
 
     def _post_process(self, message: str) -> tuple[str, List[Dict[str, str]]]:
         """Sépare le résumé des recommandations en supposant un format markdown."""
@@ -0,0 +1,160 @@
+"""Construction des prompts LLM sous contrainte d'un budget de tokens."""
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from loguru import logger
+
+from src.asr.speaker_diarizer import SpeakerSegment
+from src.rag.legal_rag import LegalArticle
+
+# Approximation utilisée lorsque tiktoken n'est pas disponible.
+CHARACTERS_PER_TOKEN = 4
+
+INSTRUCTIONS = (
+    "1. Fournis un résumé structuré en 5 puces max (faits, parties, décisions, preuves, ton).\n"
+    "2. Fournis 3 recommandations juridiques pratiques avec estimation de confiance (faible/moyenne/haute).\n"
+    "3. Signale les incertitudes ou données manquantes."
+)
+
+
+class TokenCounter:
+    """Compte les tokens avec l'encodage tiktoken du modèle (repli: ~4 caractères par token)."""
+
+    def __init__(self, model_name: str) -> None:
+        try:
+            import tiktoken
+
+            try:
+                self._encoding = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("tiktoken indisponible (%s), estimation par caractères", exc)
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        """Nombre de tokens du texte."""
+
+        if self._encoding is None:
+            return len(text) // CHARACTERS_PER_TOKEN + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Tronque le texte à ``max_tokens`` tokens."""
+
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is None:
+            return text[: max_tokens * CHARACTERS_PER_TOKEN]
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[:max_tokens])
+
+
+def compact_nlp_context(nlp_report: Dict, max_entities: int = 15) -> str:
+    """Sérialise le rapport NLP de façon compacte pour le prompt.
+
+    JSON sans indentation, entités dédoublonnées et limitées aux plus
+    fréquentes ; le détail par fenêtre est omis.
+    """
+
+    entities = Counter(
+        (entity.get("text", ""), entity.get("label", "")) for entity in nlp_report.get("entities", [])
+    )
+    context = {
+        "categorie": nlp_report.get("category"),
+        "scores_categories": _rounded(nlp_report.get("category_scores", {})),
+        "sentiment": nlp_report.get("sentiment"),
+        "score_sentiment": round(float(nlp_report.get("sentiment_score", 0.0)), 3),
+        "mots_cles": nlp_report.get("keywords", []),
+        "entites": [
+            f"{text} ({label})" for (text, label), _ in entities.most_common(max_entities)
+        ],
+    }
+    speaker_sentiments = nlp_report.get("speaker_sentiments")
+    if speaker_sentiments:
+        context["sentiments_locuteurs"] = {
+            speaker: max(scores, key=scores.get)
+            for speaker, scores in speaker_sentiments.items()
+            if scores
+        }
+    return json.dumps(context, ensure_ascii=False, separators=(",", ":"))
+
+
+class PromptBuilder:
+    """Assemble le prompt final et découpe le transcript lorsqu'il dépasse le budget."""
+
+    def __init__(self, counter: TokenCounter, token_budget: int) -> None:
+        self.counter = counter
+        self.token_budget = token_budget
+
+    @staticmethod
+    def transcript_lines(transcript: Sequence[SpeakerSegment]) -> List[str]:
+        """Une ligne horodatée par segment diarisé."""
+
+        return [
+            f"[{segment.start:.2f}-{segment.end:.2f}] {segment.speaker}: {segment.text}"
+            for segment in transcript
+        ]
+
+    @staticmethod
+    def articles_text(legal_articles: Sequence[LegalArticle]) -> str:
+        """Extraits des articles de loi retenus par le RAG."""
+
+        return "\n".join(
+            f"Article {article.article} ({article.code}) - {article.text[:400]}..."
+            for article in legal_articles
+        )
+
+    def compose(
+        self, transcript_text: str, articles_text: str, nlp_summary: str, summarized: bool = False
+    ) -> str:
+        """Assemble les différentes informations pour un prompt cohérent."""
+
+        heading = "Synthèses partielles de l'audience" if summarized else "Transcription diarisée"
+        return (
+            "Contexte NLP:\n" + nlp_summary + "\n\n"
+            + heading + ":\n" + transcript_text + "\n\n"
+            "Articles pertinents:\n" + articles_text + "\n\n"
+            + INSTRUCTIONS
+        )
+
+    def transcript_budget(self, articles_text: str, nlp_summary: str) -> int:
+        """Tokens restant pour le transcript une fois le reste du prompt compté."""
+
+        return self.token_budget - self.counter.count(self.compose("", articles_text, nlp_summary))
+
+    def fits(self, prompt: str) -> bool:
+        """Indique si le prompt respecte le budget."""
+
+        return self.counter.count(prompt) <= self.token_budget
+
+    def split_windows(self, lines: Sequence[str], window_tokens: int) -> List[str]:
+        """Regroupe des lignes consécutives en fenêtres d'au plus ``window_tokens`` tokens."""
+
+        windows: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for line in lines:
+            tokens = self.counter.count(line) + 1
+            if tokens > window_tokens:
+                line = self.counter.truncate(line, window_tokens - 1)
+                tokens = window_tokens
+            if current and current_tokens + tokens > window_tokens:
+                windows.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += tokens
+        if current:
+            windows.append("\n".join(current))
+        return windows
+
+
+def _rounded(scores: Dict[str, float]) -> Dict[str, float]:
+    """Arrondit les scores à 3 décimales pour alléger le contexte JSON."""
+
+    return {label: round(float(score), 3) for label, score in scores.items()}
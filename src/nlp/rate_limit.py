@@ -0,0 +1,98 @@
+"""Outils asynchrones de régulation des appels au LLM (seau à jetons, boucle dédiée)."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncTokenBucket:
+    """Seau à jetons: ``capacity`` jetons au plus, rechargés à ``rate_per_second``.
+
+    Une demande supérieure à la capacité est plafonnée à celle-ci, afin qu'une
+    requête volumineuse attende un seau plein au lieu de bloquer indéfiniment.
+    Une capacité nulle désactive la limitation.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Attend que ``tokens`` jetons soient disponibles puis les consomme."""
+
+        if self.capacity <= 0 or self.rate_per_second <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        tokens = min(tokens, self.capacity)
+        # Le verrou sert les demandes dans l'ordre d'arrivée.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second
+                )
+                self._updated_at = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate_per_second)
+
+
+class EventLoopThread:
+    """Boucle asyncio exécutée dans un thread démon, démarrée au premier usage.
+
+    Permet au code synchrone (workers du pipeline) de partager un même client
+    asynchrone, son pool de connexions et ses limites de débit.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Boucle en cours d'exécution, démarrée si nécessaire."""
+
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=self.name, daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def submit(self, coroutine: Awaitable[T]) -> "Future[T]":
+        """Planifie une coroutine sur la boucle et retourne un ``Future`` bloquant."""
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Exécute une coroutine sur la boucle et attend son résultat."""
+
+        return self.submit(coroutine).result()
+
+    def stop(self) -> None:
+        """Arrête la boucle et attend la fin du thread."""
+
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
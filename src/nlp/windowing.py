@@ -0,0 +1,88 @@
+"""Découpage des longs textes en fenêtres glissantes alignées sur les tokens."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+# Approximation utilisée lorsque le tokenizer ne fournit pas les offsets.
+CHARACTERS_PER_TOKEN = 4
+
+
+@dataclass
+class TextWindow:
+    """Fenêtre d'un texte, repérée par ses positions de caractères."""
+
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+
+def window_budget(tokenizer, max_tokens: int, reserved_tokens: int = 0) -> int:
+    """Nombre de tokens par fenêtre compatible avec la longueur maximale du modèle."""
+
+    model_limit = int(getattr(tokenizer, "model_max_length", max_tokens) or max_tokens)
+    special = 2
+    if hasattr(tokenizer, "num_special_tokens_to_add"):
+        special = tokenizer.num_special_tokens_to_add()
+    return max(16, min(max_tokens, model_limit - special - reserved_tokens))
+
+
+def token_windows(text: str, tokenizer, max_tokens: int, overlap: int) -> List[TextWindow]:
+    """Découpe ``text`` en fenêtres d'au plus ``max_tokens`` tokens se chevauchant de ``overlap``.
+
+    Un texte assez court donne une seule fenêtre ; sinon le nombre de fenêtres
+    croît linéairement avec la longueur du texte.
+    """
+
+    step = max(1, max_tokens - overlap)
+    if not getattr(tokenizer, "is_fast", False):
+        return _character_windows(
+            text, max_tokens * CHARACTERS_PER_TOKEN, step * CHARACTERS_PER_TOKEN
+        )
+    offsets = tokenizer(
+        text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+    )["offset_mapping"]
+    if len(offsets) <= max_tokens:
+        return [TextWindow(text, 0, len(text), len(offsets))]
+    windows = []
+    for begin in range(0, len(offsets), step):
+        chunk = offsets[begin : begin + max_tokens]
+        start, end = chunk[0][0], chunk[-1][1]
+        windows.append(TextWindow(text[start:end], start, end, len(chunk)))
+        if begin + max_tokens >= len(offsets):
+            break
+    return windows
+
+
+def aggregate_scores(
+    scores: Sequence[Dict[str, float]], windows: Sequence[TextWindow]
+) -> Dict[str, float]:
+    """Moyenne des distributions de scores des fenêtres, pondérée par leur nombre de tokens."""
+
+    totals: Dict[str, float] = {}
+    weight_sum = 0.0
+    for window_scores, window in zip(scores, windows):
+        weight = float(max(window.tokens, 1))
+        weight_sum += weight
+        for label, score in window_scores.items():
+            totals[label] = totals.get(label, 0.0) + weight * score
+    if not weight_sum:
+        return {}
+    aggregated = {label: total / weight_sum for label, total in totals.items()}
+    return dict(sorted(aggregated.items(), key=lambda item: item[1], reverse=True))
+
+
+def _character_windows(text: str, size: int, step: int) -> List[TextWindow]:
+    """Repli sans offsets de tokens: fenêtres de taille fixe en caractères."""
+
+    if len(text) <= size:
+        return [TextWindow(text, 0, len(text), max(1, len(text) // CHARACTERS_PER_TOKEN))]
+    windows = []
+    for start in range(0, len(text), step):
+        end = min(len(text), start + size)
+        tokens = (end - start) // CHARACTERS_PER_TOKEN
+        windows.append(TextWindow(text[start:end], start, end, tokens))
+        if end == len(text):
+            break
+    return windows
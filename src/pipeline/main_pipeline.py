@@ -2,19 +2,77 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, dataclass
+import queue
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from loguru import logger
 
 from config import settings
+from src.asr.batch_scheduler import BatchScheduler
+from src.asr.parallel_transcriber import ParallelWhisperTranscriber
 from src.asr.speaker_diarizer import SpeakerDiarizer, SpeakerSegment
 from src.asr.whisper_transcriber import TranscriptSegment, WhisperTranscriber
 from src.nlp.legal_nlp import LegalNLPProcessor
 from src.nlp.llm_generator import LLMGenerator, LLMResult
+from src.nlp.prompt_builder import compact_nlp_context
+from src.pipeline.model_registry import ModelRegistry
 from src.preprocessing.audio_processor import AudioChunk, AudioProcessor
-from src.rag.legal_rag import LegalArticle, LegalRAG
+from src.rag.legal_rag import LegalArticle, LegalRAG, article_id, reciprocal_rank_fusion
+
+T = TypeVar("T")
+
+# Longueur maximale du texte d'un locuteur utilisé comme requête RAG.
+SPEAKER_QUERY_MAX_CHARS = 1000
+
+
+def _prefetch(iterable: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """Consomme un itérable dans un thread dédié, avec au plus ``depth`` éléments d'avance.
+
+    Permet de recouvrir la production des chunks (décodage, débruitage) et leur
+    transcription tout en gardant une mémoire bornée.
+    """
+
+    buffer: "queue.Queue[object]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            put(exc)
+            return
+        put(done)
+
+    producer = threading.Thread(target=produce, name="chunk-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
 
 
 @dataclass
@@ -26,6 +84,7 @@ class PipelineOutput:
     nlp_report: Dict
     legal_articles: List[Dict]
     llm_result: LLMResult
+    audio_stats: Dict[str, float] = field(default_factory=dict)
 
     def to_dict(self) -> Dict:
         """Convertit l'objet en dictionnaire sérialisable."""
@@ -39,30 +98,107 @@ class PipelineOutput:
                 "summary": self.llm_result.summary,
                 "recommendations": self.llm_result.recommendations,
             },
+            "audio_stats": self.audio_stats,
         }
 
 
 class MainPipeline:
     """Gère l'exécution séquentielle de toutes les composantes du système."""
 
+    # Composants chargés par le registre, dans l'ordre de préchargement.
+    COMPONENTS = ("rag", "nlp_processor", "diarizer", "transcriber", "llm")
+
     def __init__(self) -> None:
         self.audio_processor = AudioProcessor()
-        self.transcriber = WhisperTranscriber()
-        self.diarizer = SpeakerDiarizer()
-        self.nlp_processor = LegalNLPProcessor()
-        self.rag = LegalRAG()
-        self.llm = LLMGenerator()
-
-    def process_audio(self, audio_path: Path) -> PipelineOutput:
-        """Exécute le pipeline complet sur un fichier audio unique."""
-
-        logger.info("Démarrage du pipeline pour %s", audio_path)
-        self._validate_audio_length(audio_path)
-        chunks = self.audio_processor.process(audio_path)
-        transcripts = self._transcribe_chunks(chunks)
-        diarized = self.diarizer.diarize(audio_path, transcripts)
+        # Pyannote ne dépend que du fichier audio: la diarisation tourne pendant l'ASR.
+        self._diarization_executor = ThreadPoolExecutor(
+            max_workers=settings.asr.diarization_workers, thread_name_prefix="diarization"
+        )
+        # Les modèles ne sont chargés qu'au premier usage ou lors d'un préchargement.
+        self.registry = ModelRegistry()
+        self.registry.register("rag", LegalRAG)
+        # La classification par embeddings réutilise le modèle du RAG, obtenu au premier usage
+        # seulement: en mode zero_shot, charger le NLP ne charge pas le RAG.
+        self.registry.register(
+            "nlp_processor", lambda: LegalNLPProcessor(encoder_factory=lambda: self.rag.model)
+        )
+        self.registry.register("diarizer", SpeakerDiarizer)
+        self.registry.register("transcriber", self._create_transcriber)
+        self.registry.register("llm", LLMGenerator)
+
+    @property
+    def transcriber(self) -> WhisperTranscriber | ParallelWhisperTranscriber | BatchScheduler:
+        """Transcripteur du mode configuré."""
+
+        return self.registry.get("transcriber")
+
+    @property
+    def diarizer(self) -> SpeakerDiarizer:
+        """Pipeline de diarisation pyannote."""
+
+        return self.registry.get("diarizer")
+
+    @property
+    def rag(self) -> LegalRAG:
+        """Recherche d'articles de loi."""
+
+        return self.registry.get("rag")
+
+    @property
+    def nlp_processor(self) -> LegalNLPProcessor:
+        """Analyse NLP du transcript."""
+
+        return self.registry.get("nlp_processor")
+
+    @property
+    def llm(self) -> LLMGenerator:
+        """Générateur du rapport final."""
+
+        return self.registry.get("llm")
+
+    def warmup(self, components: Optional[Iterable[str]] = None, background: bool = False) -> bool:
+        """Précharge les composants (tous par défaut), voir ``ModelRegistry.warmup``."""
+
+        return self.registry.warmup(components or self.COMPONENTS, background=background)
+
+    def close(self) -> None:
+        """Libère les ressources des composants déjà chargés."""
+
+        self._diarization_executor.shutdown(wait=False)
+        llm = self.registry.loaded("llm")
+        if llm is not None:
+            llm.close()
+
+    def process_audio(self, audio_path: Path, job_id: Optional[str] = None) -> PipelineOutput:
+        """Exécute le pipeline complet sur un fichier audio unique.
+
+        Chaque exécution dispose de son propre espace de travail, ce qui permet
+        de traiter plusieurs audiences simultanément avec la même instance.
+        """
+
+        job_id = job_id or uuid.uuid4().hex
+        logger.info("Démarrage du pipeline pour %s (tâche %s)", audio_path, job_id)
+        duration = self._validate_audio_length(audio_path)
+        # Le diarizer est résolu dans le thread de diarisation: au démarrage à froid, le
+        # chargement de pyannote se recouvre lui aussi avec le prétraitement et l'ASR.
+        speakers_future = self._diarization_executor.submit(
+            lambda: self.diarizer.detect_speakers(audio_path)
+        )
+        try:
+            with self.audio_processor.scratch(job_id) as scratch:
+                if settings.preprocessing.streaming:
+                    chunks: Iterable[AudioChunk] = _prefetch(
+                        self.audio_processor.stream(audio_path, scratch)
+                    )
+                else:
+                    chunks = self.audio_processor.process(audio_path, scratch)
+                transcripts, speech_seconds = self._transcribe_chunks(chunks)
+        except Exception:
+            speakers_future.cancel()
+            raise
+        diarized = self.diarizer.merge(transcripts, speakers_future.result())
         nlp_report = self._build_nlp_report(diarized)
-        rag_results = self._search_legal_articles(nlp_report)
+        rag_results = self._search_legal_articles(nlp_report, diarized)
         llm_result = self._generate_llm_report(diarized, rag_results, nlp_report)
         output = PipelineOutput(
             transcription=transcripts,
@@ -70,32 +206,82 @@ class MainPipeline:
             nlp_report=nlp_report,
             legal_articles=[asdict(article) | {"score": score} for article, score in rag_results],
             llm_result=llm_result,
+            audio_stats={
+                "duration_seconds": round(duration, 2),
+                "speech_seconds": round(speech_seconds, 2),
+                "skipped_seconds": round(max(0.0, duration - speech_seconds), 2),
+            },
         )
         self._persist_output(audio_path, output)
         logger.info("Pipeline terminé pour %s", audio_path)
         return output
 
-    def _transcribe_chunks(self, chunks: List[AudioChunk]) -> List[TranscriptSegment]:
-        """Transcrit chaque chunk et ajuste les timestamps."""
+    @staticmethod
+    def _create_transcriber() -> WhisperTranscriber | ParallelWhisperTranscriber | BatchScheduler:
+        """Sélectionne le mode de transcription configuré."""
+
+        mode = settings.asr.transcription_mode
+        if mode == "parallel":
+            return ParallelWhisperTranscriber()
+        if mode == "batched":
+            # Le planificateur est partagé par toutes les exécutions de ce pipeline.
+            return BatchScheduler(WhisperTranscriber())
+        return WhisperTranscriber()
 
+    def _transcribe_chunks(
+        self, chunks: Iterable[AudioChunk]
+    ) -> Tuple[List[TranscriptSegment], float]:
+        """Transcrit chaque chunk et ajuste les timestamps.
+
+        Les chunks sont soumis dès leur production; le nombre de chunks en
+        attente de résultat est borné pour limiter la mémoire en mode flux.
+
+        Returns:
+            Les segments triés et la durée de parole détectée par la VAD dans les
+            chunks (hors marges et pauses internes), calculée par le prétraitement.
+        """
+
+        max_in_flight = 2 * max(settings.asr.transcription_workers, settings.asr.batch_size)
         transcripts: List[TranscriptSegment] = []
+        speech_seconds = 0.0
+        in_flight: Deque[Tuple[AudioChunk, Future]] = deque()
         for chunk in chunks:
-            chunk_segments = self.transcriber.transcribe(chunk.file_path)
-            for segment in chunk_segments:
-                adjusted = TranscriptSegment(
+            speech_seconds += chunk.speech_seconds
+            in_flight.append((chunk, self.transcriber.submit(chunk.source)))
+            if len(in_flight) >= max_in_flight:
+                self._collect_chunk(*in_flight.popleft(), transcripts)
+        while in_flight:
+            self._collect_chunk(*in_flight.popleft(), transcripts)
+        transcripts.sort(key=lambda segment: segment.start)
+        return transcripts, speech_seconds
+
+    @staticmethod
+    def _collect_chunk(
+        chunk: AudioChunk, future: Future, transcripts: List[TranscriptSegment]
+    ) -> None:
+        """Attend les segments d'un chunk et les recale sur la timeline globale."""
+
+        for segment in future.result():
+            transcripts.append(
+                TranscriptSegment(
                     text=segment.text,
                     start=segment.start + chunk.start_time,
                     end=segment.end + chunk.start_time,
                     confidence=segment.confidence,
                 )
-                transcripts.append(adjusted)
-        return transcripts
+            )
 
     def _build_nlp_report(self, diarized: List[SpeakerSegment]) -> Dict:
         """Agrège les textes diarises pour créer un rapport NLP global."""
 
         full_text = "\n".join(f"{segment.speaker}: {segment.text}" for segment in diarized)
-        report = self.nlp_processor.analyse(full_text)
+        speaker_texts: Dict[str, List[str]] = {}
+        for segment in diarized:
+            speaker_texts.setdefault(segment.speaker, []).append(segment.text.strip())
+        report = self.nlp_processor.analyse(
+            full_text,
+            speaker_texts={speaker: " ".join(parts) for speaker, parts in speaker_texts.items()},
+        )
         return {
             "entities": [asdict(entity) for entity in report.entities],
             "sentiment": report.sentiment,
@@ -103,16 +289,53 @@ class MainPipeline:
             "category": report.category,
             "category_scores": report.category_scores,
             "keywords": report.keywords,
+            "windows": [asdict(window) for window in report.windows],
+            "speaker_sentiments": report.speaker_sentiments,
         }
 
-    def _search_legal_articles(self, nlp_report: Dict) -> List[tuple[LegalArticle, float]]:
-        """Utilise les mots-clés et la catégorie pour interroger le RAG."""
+    def _search_legal_articles(
+        self, nlp_report: Dict, diarized: Optional[List[SpeakerSegment]] = None, top_k: int = 5
+    ) -> List[tuple[LegalArticle, float]]:
+        """Utilise les mots-clés et la catégorie pour interroger le RAG.
+
+        Avec ``RAG_SPEAKER_QUERIES``, les propos de chaque locuteur forment une
+        requête supplémentaire ; toutes sont résolues en un seul lot et leurs
+        classements fusionnés par RRF.
+        """
 
         keywords = " ".join(nlp_report.get("keywords", []))
         query = f"{nlp_report.get('category', '')} {keywords}".strip()
         if not query:
             query = "procédure judiciaire"
-        return self.rag.search(query)
+        queries = [query]
+        if settings.models.rag_speaker_queries and diarized:
+            queries.extend(self._speaker_queries(diarized))
+        result_lists = self.rag.search_many(queries, top_k, category=nlp_report.get("category"))
+        if len(result_lists) == 1:
+            return result_lists[0]
+
+        best: Dict[int, tuple[LegalArticle, float]] = {}
+        rankings = []
+        for results in result_lists:
+            ranking = []
+            for article, score in results:
+                identifier = article_id(*article.key)
+                if identifier not in best or score > best[identifier][1]:
+                    best[identifier] = (article, score)
+                ranking.append(identifier)
+            rankings.append(ranking)
+        fused = reciprocal_rank_fusion(rankings, settings.models.rag_rrf_k)
+        return [best[identifier] for identifier in fused[:top_k]]
+
+    @staticmethod
+    def _speaker_queries(diarized: List[SpeakerSegment]) -> List[str]:
+        """Regroupe les propos de chaque locuteur en une requête tronquée."""
+
+        texts: Dict[str, List[str]] = {}
+        for segment in diarized:
+            texts.setdefault(segment.speaker, []).append(segment.text.strip())
+        queries = [" ".join(parts)[:SPEAKER_QUERY_MAX_CHARS].strip() for parts in texts.values()]
+        return [query for query in queries if query]
 
     def _generate_llm_report(
         self,
@@ -123,7 +346,7 @@ class MainPipeline:
         """Construit les entrées pour le LLM et récupère le rapport final."""
 
         articles = [article for article, _ in rag_results]
-        nlp_summary = json.dumps(nlp_report, ensure_ascii=False, indent=2)
+        nlp_summary = compact_nlp_context(nlp_report)
         return self.llm.build_report(diarized, articles, nlp_summary)
 
     def _persist_output(self, audio_path: Path, output: PipelineOutput) -> None:
@@ -136,12 +359,13 @@ class MainPipeline:
             json.dump(output.to_dict(), file, ensure_ascii=False, indent=2)
         logger.info("Résultats sauvegardés dans %s", output_file)
 
-    def _validate_audio_length(self, audio_path: Path) -> None:
-        """Vérifie que la durée du fichier respecte les limites configurées."""
+    def _validate_audio_length(self, audio_path: Path) -> float:
+        """Vérifie que la durée du fichier respecte les limites et la retourne (secondes)."""
 
         import soundfile as sf  # import local pour accélérer le chargement global
 
         with sf.SoundFile(audio_path) as audio_file:
-            duration_minutes = audio_file.frames / audio_file.samplerate / 60
-        if duration_minutes > settings.limits.max_audio_minutes:
+            duration_seconds = audio_file.frames / audio_file.samplerate
+        if duration_seconds / 60 > settings.limits.max_audio_minutes:
             raise ValueError("Durée audio supérieure à la limite autorisée.")
+        return duration_seconds
@@ -0,0 +1,148 @@
+"""Registre des composants lourds du pipeline, chargés à la demande ou en arrière-plan."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+class ComponentStatus(str, Enum):
+    """États successifs du chargement d'un composant."""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+@dataclass
+class _Component:
+    """Fabrique d'un composant et état de son chargement."""
+
+    factory: Callable[[], Any]
+    lock: threading.Lock
+    status: ComponentStatus = ComponentStatus.PENDING
+    instance: Any = None
+    error: Optional[str] = None
+    load_seconds: Optional[float] = None
+
+
+class ModelRegistry:
+    """Instancie chaque composant une seule fois, lors de son premier usage.
+
+    ``get`` charge le composant dans le thread appelant (ou attend le
+    chargement déjà en cours) ; ``warmup`` précharge une liste de composants,
+    éventuellement dans un thread d'arrière-plan, pour que l'API réponde
+    pendant le chargement des modèles.
+    """
+
+    def __init__(self) -> None:
+        self._components: Dict[str, _Component] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Déclare un composant et la fonction qui le construit."""
+
+        self._components[name] = _Component(factory=factory, lock=threading.Lock())
+
+    @property
+    def names(self) -> List[str]:
+        """Noms des composants, dans l'ordre d'enregistrement."""
+
+        return list(self._components)
+
+    def get(self, name: str) -> Any:
+        """Retourne le composant, en le chargeant si nécessaire.
+
+        Un échec de chargement est propagé ; l'appel suivant retente le chargement.
+        """
+
+        component = self._components[name]
+        if component.status is ComponentStatus.READY:
+            return component.instance
+        with component.lock:
+            if component.status is ComponentStatus.READY:
+                return component.instance
+            component.status = ComponentStatus.LOADING
+            component.error = None
+            logger.info("Chargement du composant %s", name)
+            start = time.perf_counter()
+            try:
+                instance = component.factory()
+            except Exception as exc:  # noqa: BLE001
+                component.status = ComponentStatus.FAILED
+                component.error = f"{type(exc).__name__}: {exc}"
+                logger.exception("Échec du chargement du composant %s: %s", name, exc)
+                raise
+            component.instance = instance
+            component.load_seconds = round(time.perf_counter() - start, 3)
+            component.status = ComponentStatus.READY
+            logger.info("Composant %s prêt en %.1f s", name, component.load_seconds)
+            return instance
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """Retourne le composant s'il est déjà chargé, sans déclencher de chargement."""
+
+        component = self._components[name]
+        return component.instance if component.status is ComponentStatus.READY else None
+
+    def warmup(self, names: Optional[Iterable[str]] = None, background: bool = False) -> bool:
+        """Précharge les composants demandés (tous par défaut).
+
+        Args:
+            names: Composants à charger, dans l'ordre fourni.
+            background: Charge dans un thread démon et retourne immédiatement.
+
+        Returns:
+            ``False`` si un préchargement en arrière-plan est déjà en cours.
+        """
+
+        selected = list(names) if names is not None else self.names
+        unknown = [name for name in selected if name not in self._components]
+        if unknown:
+            raise KeyError(f"Composants inconnus: {', '.join(unknown)}")
+        if not background:
+            self._load_all(selected)
+            return True
+        with self._warmup_lock:
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                return False
+            self._warmup_thread = threading.Thread(
+                target=self._load_all, args=(selected,), name="model-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+        return True
+
+    def is_ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        """Indique si tous les composants demandés sont chargés."""
+
+        selected = list(names) if names is not None else self.names
+        return all(
+            self._components[name].status is ComponentStatus.READY for name in selected
+        )
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """État de chargement de chaque composant, exposé par ``/ready``."""
+
+        return {
+            name: {
+                "status": component.status.value,
+                "load_seconds": component.load_seconds,
+                "error": component.error,
+            }
+            for name, component in self._components.items()
+        }
+
+    def _load_all(self, names: List[str]) -> None:
+        """Charge les composants un par un ; un échec n'interrompt pas les suivants."""
+
+        for name in names:
+            try:
+                self.get(name)
+            except Exception:  # noqa: BLE001 - déjà journalisé et exposé par ``status``
+                continue
@@ -1,43 +1,88 @@
 """Module de prétraitement audio pour LegalAssistMA."""
 from __future__ import annotations
 
-import io
+import itertools
+import subprocess
+import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Sequence
+from typing import Iterator, List, Optional, Sequence
 
 import numpy as np
-import soundfile as sf
 from loguru import logger
-from noisereduce import reduce_noise
 from pydub import AudioSegment
 
 from config import settings
+from src.preprocessing.denoiser import BlockDenoiser
+from src.preprocessing.scratch import ScratchSpace, purge_stale_scratch
+from src.preprocessing.vad import SpeechChunker, log_skipped_audio
 
 
 @dataclass
 class AudioChunk:
-    """Représente un segment audio découpé après prétraitement."""
+    """Représente un segment audio découpé après prétraitement.
 
-    file_path: Path
+    ``samples`` est une vue float32 (16 kHz mono) sur le signal nettoyé complet;
+    ``file_path`` n'est renseigné qu'en mode d'export disque (débogage).
+    ``speech_seconds`` est la durée de parole détectée par la VAD dans le chunk,
+    hors marges et pauses internes (durée complète en découpage fixe).
+    """
+
+    file_path: Optional[Path]
     start_time: float
     end_time: float
+    samples: Optional[np.ndarray] = None
+    speech_seconds: float = 0.0
+
+    @property
+    def source(self) -> np.ndarray | Path:
+        """Retourne l'entrée à transmettre à Whisper, en privilégiant la mémoire."""
+
+        if self.samples is not None:
+            return self.samples
+        if self.file_path is None:
+            raise ValueError("Le chunk ne contient ni échantillons ni fichier.")
+        return self.file_path
 
 
 class AudioProcessor:
     """Effectue le chargement, la normalisation et le découpage des fichiers audio."""
 
-    def __init__(self, target_sr: int = 16_000, chunk_duration: int = 30) -> None:
+    def __init__(
+        self,
+        target_sr: int = 16_000,
+        chunk_duration: int = 30,
+        export_chunks: Optional[bool] = None,
+    ) -> None:
         self.target_sr = target_sr
         self.chunk_duration = chunk_duration
-        self.output_dir = settings.paths.data_dir / "processed_audio"
+        self.export_chunks = (
+            settings.preprocessing.export_chunks if export_chunks is None else export_chunks
+        )
+        self.denoiser = BlockDenoiser(target_sr)
+        self.chunker = (
+            SpeechChunker(target_sr, chunk_duration)
+            if settings.preprocessing.chunking_mode == "vad"
+            else None
+        )
+        self.output_dir = settings.preprocessing.scratch_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        purge_stale_scratch(self.output_dir)
+
+    def scratch(self, job_id: Optional[str] = None) -> ScratchSpace:
+        """Crée l'espace de travail isolé d'une exécution du pipeline."""
 
-    def process(self, audio_path: Path) -> List[AudioChunk]:
+        return ScratchSpace(self.output_dir, job_id or uuid.uuid4().hex)
+
+    def process(
+        self, audio_path: Path, scratch: Optional[ScratchSpace] = None
+    ) -> List[AudioChunk]:
         """Traite un fichier audio et retourne les chunks nettoyés.
 
         Args:
             audio_path: Chemin du fichier audio original.
+            scratch: Espace de travail de la tâche, utilisé si l'export disque
+                est activé. À défaut, un espace conservé est créé.
 
         Returns:
             Liste de segments prêts pour la transcription.
@@ -46,69 +91,244 @@ class AudioProcessor:
         try:
             logger.info("Prétraitement de l'audio %s", audio_path)
             audio_segment = self._load_audio(audio_path)
-            cleaned_audio = self._denoise_audio(audio_segment)
-            chunks = self._split_audio(cleaned_audio)
+            samples = self._to_float_array(audio_segment)
+            del audio_segment
+            cleaned_audio = self._denoise_audio(samples)
+            if self.export_chunks and scratch is None:
+                scratch = ScratchSpace(self.output_dir, uuid.uuid4().hex, keep=True)
+            chunks = self._split_audio(cleaned_audio, scratch)
             logger.info("Prétraitement terminé: %s segments produits", len(chunks))
             return chunks
         except Exception as exc:  # noqa: BLE001
             logger.exception("Erreur lors du prétraitement: %s", exc)
             raise
 
+    def stream(
+        self, audio_path: Path, scratch: Optional[ScratchSpace] = None
+    ) -> Iterator[AudioChunk]:
+        """Décode, nettoie et produit les chunks bloc par bloc, à mémoire bornée.
+
+        Seuls le bloc courant et le dernier chunk inachevé sont conservés en
+        mémoire: le premier chunk peut être transcrit pendant que ffmpeg décode
+        la suite du fichier. Un chunk est produit dès qu'il ne peut plus
+        s'étendre: silence suivant de plus de ``VAD_MAX_GAP_MS`` ou durée
+        maximale atteinte, si bien qu'une longue suspension d'audience ne retarde
+        pas sa transcription et n'est pas conservée en mémoire.
+        """
+
+        logger.info("Prétraitement en flux de l'audio %s", audio_path)
+        if self.export_chunks and scratch is None:
+            scratch = ScratchSpace(self.output_dir, uuid.uuid4().hex, keep=True)
+        block_samples = self.chunk_duration * self.target_sr
+        blocks = self._decode_blocks(audio_path, block_samples)
+        first_block = next(blocks, None)
+        if first_block is None:
+            raise ValueError("Le fichier audio ne contient aucun échantillon.")
+        # Profil de bruit (mode stationnaire) estimé sur le premier bloc puis réutilisé.
+        noise_clip = (
+            self.denoiser.estimate_noise(first_block) if self.denoiser.stationary else None
+        )
+        threshold = self.chunker.running_threshold() if self.chunker is not None else None
+        threshold_db: Optional[float] = None
+        # Signal en attente: dernier chunk VAD, susceptible de se prolonger au bloc suivant,
+        # ou tranche fixe incomplète.
+        pending = np.empty(0, dtype=np.float32)
+        pending_offset = 0
+        decoded = 0
+        kept = 0
+        index = 0
+        # Les blocs sont fondus entre eux comme en traitement complet (``DENOISE_OVERLAP_SECONDS``).
+        for cleaned in self.denoiser.denoise_stream(
+            itertools.chain([first_block], blocks), noise_clip
+        ):
+            decoded += cleaned.shape[0]
+            if self.chunker is None:
+                # Les morceaux débruités n'ont pas la taille des blocs (le dernier inclut le
+                # recouvrement): ils sont redécoupés en tranches fixes de ``chunk_duration``.
+                pending = np.concatenate((pending, cleaned))
+                while pending.shape[0] >= block_samples:
+                    yield self._make_chunk(pending[:block_samples], pending_offset, index, scratch)
+                    pending = pending[block_samples:]
+                    pending_offset += block_samples
+                    index += 1
+                continue
+            threshold_db = threshold.update(cleaned)
+            buffer = np.concatenate((pending, cleaned))
+            regions = self.chunker.speech_regions(buffer, threshold_db)
+            spans = self.chunker.pack(regions, buffer)
+            # Le dernier chunk reste ouvert tant qu'une parole à venir (dont la zone commence au
+            # plus ``padding`` avant la fin du tampon) peut encore s'y rattacher.
+            closed = spans
+            horizon = buffer.shape[0] - self.chunker.padding
+            if (
+                spans
+                and horizon - spans[-1][1] <= self.chunker.max_gap
+                and horizon - spans[-1][0] < self.chunker.max_chunk
+            ):
+                closed = spans[:-1]
+            for start, end in closed:
+                speech = self.chunker.speech_samples(regions, start, end)
+                yield self._make_chunk(
+                    buffer[start:end], pending_offset + start, index, scratch, speech
+                )
+                kept += speech
+                index += 1
+            if len(closed) < len(spans):
+                keep_from = spans[-1][0]
+            else:
+                # Seule une marge est conservée: un long silence ne s'accumule pas en mémoire.
+                keep_from = max(
+                    spans[-1][1] if spans else 0, buffer.shape[0] - self.chunker.padding
+                )
+            pending = buffer[keep_from:]
+            pending_offset += keep_from
+        if self.chunker is None and pending.size:
+            yield self._make_chunk(pending, pending_offset, index, scratch)
+            index += 1
+        elif pending.size:
+            regions = self.chunker.speech_regions(pending, threshold_db)
+            for start, end in self.chunker.pack(regions, pending):
+                speech = self.chunker.speech_samples(regions, start, end)
+                yield self._make_chunk(
+                    pending[start:end], pending_offset + start, index, scratch, speech
+                )
+                kept += speech
+                index += 1
+        if self.chunker is not None:
+            log_skipped_audio(decoded, kept, self.target_sr)
+        logger.info("Prétraitement en flux terminé: %s segments produits", index)
+
+    def _decode_blocks(self, audio_path: Path, block_samples: int) -> Iterator[np.ndarray]:
+        """Lit la sortie PCM de ffmpeg (16 kHz mono) par blocs de ``block_samples``."""
+
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            str(audio_path),
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(self.target_sr),
+            "-",
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            while True:
+                data = process.stdout.read(block_samples * 2)
+                if not data:
+                    break
+                pcm = np.frombuffer(data[: len(data) - len(data) % 2], dtype=np.int16)
+                yield pcm.astype(np.float32) / 32768.0
+            if process.wait() != 0:
+                error = process.stderr.read().decode(errors="replace").strip()
+                raise RuntimeError(f"Échec du décodage ffmpeg de {audio_path}: {error}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
     def _load_audio(self, audio_path: Path) -> AudioSegment:
         """Charge le fichier audio en assurant un format cohérent."""
 
         try:
             audio = AudioSegment.from_file(audio_path)
-            normalized = audio.set_frame_rate(self.target_sr).set_channels(1)
+            normalized = audio.set_frame_rate(self.target_sr).set_channels(1).set_sample_width(2)
             logger.debug("Audio chargé et normalisé en %s Hz mono", self.target_sr)
             return normalized
         except Exception as exc:  # noqa: BLE001
             logger.error("Impossible de charger %s : %s", audio_path, exc)
             raise
 
-    def _denoise_audio(self, audio_segment: AudioSegment) -> AudioSegment:
+    @staticmethod
+    def _to_float_array(audio_segment: AudioSegment) -> np.ndarray:
+        """Convertit le PCM 16 bits en signal float32 dans [-1, 1]."""
+
+        pcm = np.frombuffer(audio_segment.raw_data, dtype=np.int16)
+        return pcm.astype(np.float32) / 32768.0
+
+    def _denoise_audio(
+        self, samples: np.ndarray, noise_clip: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """Réduit le bruit de fond tout en préservant l'information vocale."""
 
-        samples = np.array(audio_segment.get_array_of_samples()).astype(np.float32)
         if samples.size == 0:
             raise ValueError("Le fichier audio ne contient aucun échantillon.")
         logger.debug("Réduction de bruit sur %s échantillons", samples.size)
-        reduced = reduce_noise(y=samples, sr=self.target_sr)
-        output_segment = audio_segment._spawn(np.int16(reduced).tobytes())
-        return output_segment
+        return self.denoiser.denoise(samples, noise_clip)
 
-    def _split_audio(self, audio_segment: AudioSegment) -> List[AudioChunk]:
-        """Découpe l'audio en segments fixes et les sauvegarde sur disque."""
+    def _split_audio(
+        self, samples: np.ndarray, scratch: Optional[ScratchSpace] = None
+    ) -> List[AudioChunk]:
+        """Découpe le signal en chunks, sous forme de vues sans copie.
 
-        chunk_length_ms = self.chunk_duration * 1000
-        total_duration_ms = len(audio_segment)
-        chunks: List[AudioChunk] = []
-        start_ms = 0
-        index = 0
-        while start_ms < total_duration_ms:
-            end_ms = min(start_ms + chunk_length_ms, total_duration_ms)
-            chunk = audio_segment[start_ms:end_ms]
-            chunk_path = self._export_chunk(chunk, index)
-            chunks.append(
-                AudioChunk(
-                    file_path=chunk_path,
-                    start_time=start_ms / 1000,
-                    end_time=end_ms / 1000,
-                )
+        En mode VAD, les silences sont écartés et les zones de parole regroupées
+        en chunks d'au plus ``chunk_duration`` secondes; sinon découpage fixe.
+        """
+
+        total_samples = samples.shape[0]
+        if self.chunker is not None:
+            regions = self.chunker.speech_regions(
+                samples, self.chunker.estimate_threshold(samples)
             )
-            start_ms = end_ms
-            index += 1
-        return chunks
+            # Seule la parole compte comme conservée, pas les courtes pauses internes aux chunks.
+            spans = [
+                (start, end, self.chunker.speech_samples(regions, start, end))
+                for start, end in self.chunker.pack(regions, samples)
+            ]
+            log_skipped_audio(total_samples, sum(span[2] for span in spans), self.target_sr)
+        else:
+            chunk_length = self.chunk_duration * self.target_sr
+            spans = [
+                (start, min(start + chunk_length, total_samples), None)
+                for start in range(0, total_samples, chunk_length)
+            ]
+        return [
+            self._make_chunk(samples[start:end], start, index, scratch, speech)
+            for index, (start, end, speech) in enumerate(spans)
+        ]
+
+    def _make_chunk(
+        self,
+        samples: np.ndarray,
+        start_sample: int,
+        index: int,
+        scratch: Optional[ScratchSpace],
+        speech_samples: Optional[int] = None,
+    ) -> AudioChunk:
+        """Construit un chunk positionné sur la timeline et l'exporte si demandé.
+
+        ``speech_samples`` (parole détectée dans le chunk) vaut par défaut sa longueur.
+        """
+
+        chunk_path = (
+            self._export_chunk(samples, index, scratch)
+            if self.export_chunks and scratch is not None
+            else None
+        )
+        return AudioChunk(
+            file_path=chunk_path,
+            start_time=start_sample / self.target_sr,
+            end_time=(start_sample + samples.shape[0]) / self.target_sr,
+            samples=samples,
+            speech_seconds=(
+                samples.shape[0] if speech_samples is None else speech_samples
+            )
+            / self.target_sr,
+        )
 
-    def _export_chunk(self, chunk: AudioSegment, index: int) -> Path:
-        """Exporte un segment audio au format WAV 16kHz mono."""
+    def _export_chunk(self, samples: np.ndarray, index: int, scratch: ScratchSpace) -> Path:
+        """Exporte un segment audio au format WAV 16kHz mono (mode débogage)."""
 
-        buffer = io.BytesIO()
-        chunk.export(buffer, format="wav")
-        buffer.seek(0)
-        file_path = self.output_dir / f"chunk_{index:04d}.wav"
-        data, samplerate = sf.read(buffer)
-        sf.write(file_path, data, samplerate)
+        file_path = scratch.write_audio(f"chunk_{index:04d}.wav", samples, self.target_sr)
         logger.debug("Chunk %s sauvegardé dans %s", index, file_path)
         return file_path
 
@@ -0,0 +1,195 @@
+"""Réduction de bruit par blocs avec recouvrement (overlap-add)."""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+
+def _denoise_block(
+    block: np.ndarray, noise_clip: Optional[np.ndarray], sample_rate: int
+) -> np.ndarray:
+    """Débruite un bloc (exécuté dans un worker).
+
+    Sans profil de bruit, ``noisereduce`` est utilisé en mode non stationnaire,
+    comme le traitement en une passe d'origine ; sinon en mode stationnaire
+    avec le profil commun.
+    """
+
+    from noisereduce import reduce_noise  # import local pour accélérer le chargement global
+
+    if noise_clip is None:
+        reduced = reduce_noise(y=block, sr=sample_rate)
+    else:
+        reduced = reduce_noise(y=block, sr=sample_rate, y_noise=noise_clip, stationary=True)
+    return np.asarray(reduced, dtype=np.float32)
+
+
+class BlockDenoiser:
+    """Applique ``noisereduce`` bloc par bloc avec un fondu enchaîné entre blocs.
+
+    Par défaut chaque bloc est traité en mode non stationnaire, comme le
+    traitement en une passe d'origine. Avec ``DENOISE_STATIONARY``, le profil de
+    bruit est estimé une seule fois (début du signal ou trames les plus
+    silencieuses) puis partagé par tous les blocs. Dans les deux cas, la mémoire
+    des STFT est bornée par la taille des blocs.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        block_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        noise_seconds: Optional[float] = None,
+        noise_source: Optional[str] = None,
+        workers: Optional[int] = None,
+        stationary: Optional[bool] = None,
+    ) -> None:
+        config = settings.preprocessing
+        self.sample_rate = sample_rate
+        self.stationary = config.denoise_stationary if stationary is None else stationary
+        self.block_samples = int((block_seconds or config.denoise_block_seconds) * sample_rate)
+        overlap = config.denoise_overlap_seconds if overlap_seconds is None else overlap_seconds
+        self.overlap_samples = min(int(overlap * sample_rate), self.block_samples // 2)
+        self.noise_samples = int((noise_seconds or config.denoise_noise_seconds) * sample_rate)
+        self.noise_source = noise_source or config.denoise_noise_source
+        self.workers = max(1, workers or config.denoise_workers)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def estimate_noise(self, samples: np.ndarray) -> np.ndarray:
+        """Extrait un extrait de bruit représentatif du signal."""
+
+        if self.noise_source == "silence":
+            frame = max(1, self.sample_rate // 20)
+            n_frames = samples.shape[0] // frame
+            if n_frames > 0:
+                frames = samples[: n_frames * frame].reshape(n_frames, frame)
+                energy = np.mean(frames**2, axis=1)
+                quietest = np.sort(np.argsort(energy)[: max(1, self.noise_samples // frame)])
+                return np.ascontiguousarray(frames[quietest].reshape(-1))
+        return np.ascontiguousarray(samples[: self.noise_samples])
+
+    def denoise(self, samples: np.ndarray, noise_clip: Optional[np.ndarray] = None) -> np.ndarray:
+        """Débruite le signal complet par blocs et recompose la sortie.
+
+        Args:
+            samples: Signal float32 mono.
+            noise_clip: Profil de bruit déjà estimé (mode flux); sinon calculé ici
+                en mode stationnaire, ignoré en mode non stationnaire.
+
+        Returns:
+            Signal débruité float32 contigu, de même longueur que l'entrée.
+        """
+
+        if samples.size == 0:
+            raise ValueError("Le fichier audio ne contient aucun échantillon.")
+        if not self.stationary:
+            noise_clip = None
+        elif noise_clip is None:
+            noise_clip = self.estimate_noise(samples)
+        total = samples.shape[0]
+        if total <= self.block_samples:
+            return _denoise_block(samples, noise_clip, self.sample_rate)
+
+        hop = self.block_samples - self.overlap_samples
+        # Chaque bloc déborde de plus de ``overlap`` sur la fin: les fondus ne se chevauchent
+        # qu'entre deux blocs consécutifs et leurs poids se somment exactement à 1.
+        starts = list(range(0, total - self.overlap_samples, hop))
+        blocks = [samples[start : start + self.block_samples] for start in starts]
+        logger.debug(
+            "Réduction de bruit sur %s blocs (%s workers)", len(blocks), self.workers
+        )
+        fade_in, fade_out = self._crossfade()
+        output = np.zeros(total, dtype=np.float32)
+        for position, (start, reduced) in enumerate(
+            zip(starts, self._map(blocks, noise_clip))
+        ):
+            if self.overlap_samples and position > 0:
+                reduced[: self.overlap_samples] *= fade_in
+            if self.overlap_samples and position < len(starts) - 1:
+                reduced[-self.overlap_samples :] *= fade_out
+            output[start : start + reduced.shape[0]] += reduced
+        return output
+
+    def denoise_stream(
+        self, blocks: Iterable[np.ndarray], noise_clip: Optional[np.ndarray] = None
+    ) -> Iterator[np.ndarray]:
+        """Débruite une suite de blocs décodés avec le même fondu enchaîné que ``denoise``.
+
+        Chaque bloc est traité avec les ``overlap`` derniers échantillons du bloc
+        précédent ; la fin débruitée de chaque bloc est retenue puis fondue avec
+        le début du suivant. Les morceaux produits sont contigus et leur
+        concaténation a la longueur du signal décodé. Un bloc d'avance est lu
+        afin que la fin du signal soit rattachée au dernier morceau plutôt que
+        produite seule (elle formerait sinon un chunk d'environ ``overlap``).
+        """
+
+        pending = (block for block in blocks if block.size)
+        block = next(pending, None)
+        raw_tail = np.empty(0, dtype=np.float32)
+        tail = np.empty(0, dtype=np.float32)
+        while block is not None:
+            following = next(pending, None)
+            window = np.concatenate((raw_tail, block))
+            reduced = self.denoise(window, noise_clip)
+            head = raw_tail.shape[0]
+            if head:
+                fade_in, fade_out = self._crossfade(head)
+                reduced[:head] = tail * fade_out + reduced[:head] * fade_in
+            if following is None:
+                yield reduced
+                return
+            keep = min(self.overlap_samples, window.shape[0])
+            ready = window.shape[0] - keep
+            if ready:
+                yield reduced[:ready]
+            tail = reduced[ready:]
+            raw_tail = window[ready:]
+            block = following
+
+    def shutdown(self) -> None:
+        """Arrête le pool de workers éventuel."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _crossfade(self, length: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Rampes sin²/cos² dont la somme vaut 1 sur la zone de recouvrement."""
+
+        length = self.overlap_samples if length is None else length
+        phase = (np.arange(length, dtype=np.float32) + 0.5) / max(1, length)
+        fade_in = np.sin(phase * np.pi / 2) ** 2
+        return fade_in, 1.0 - fade_in
+
+    def _map(self, blocks: List[np.ndarray], noise_clip: Optional[np.ndarray]):
+        """Traite les blocs en parallèle en conservant leur ordre."""
+
+        if self.workers == 1 or len(blocks) == 1:
+            return (_denoise_block(block, noise_clip, self.sample_rate) for block in blocks)
+        executor = self._get_executor()
+        return executor.map(
+            _denoise_block,
+            blocks,
+            [noise_clip] * len(blocks),
+            [self.sample_rate] * len(blocks),
+        )
+
+    def _get_executor(self) -> Executor:
+        """Crée le pool de processus à la première utilisation."""
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
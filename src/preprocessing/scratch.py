@@ -0,0 +1,116 @@
+"""Espaces de travail temporaires isolés par exécution du pipeline."""
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+from loguru import logger
+
+from config import settings
+
+WAV_HEADER_BYTES = 44
+
+
+class ScratchQuotaExceeded(RuntimeError):
+    """Levée lorsque l'écriture dépasserait le quota disque des espaces de travail."""
+
+
+class ScratchSpace:
+    """Répertoire propre à une tâche, supprimé à la sortie du contexte.
+
+    Le quota est partagé par tous les espaces de travail actifs du processus,
+    afin de borner l'occupation disque quand plusieurs audiences tournent en
+    parallèle. Le répertoire n'est créé qu'à la première écriture.
+    """
+
+    _usage_lock = threading.Lock()
+    _used_bytes = 0
+
+    def __init__(
+        self,
+        root: Path,
+        job_id: str,
+        quota_bytes: Optional[int] = None,
+        keep: Optional[bool] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.job_id = job_id
+        self.quota_bytes = (
+            settings.preprocessing.scratch_quota_mb * 1024 * 1024
+            if quota_bytes is None
+            else quota_bytes
+        )
+        self.keep = settings.preprocessing.keep_scratch if keep is None else keep
+        self._path: Optional[Path] = None
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """Répertoire de la tâche, créé à la demande avec un nom unique."""
+
+        with self._lock:
+            if self._path is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                self._path = Path(tempfile.mkdtemp(prefix=f"{self.job_id}_", dir=self.root))
+            return self._path
+
+    def write_audio(self, name: str, samples: np.ndarray, sample_rate: int) -> Path:
+        """Écrit un signal en WAV PCM 16 bits après réservation dans le quota."""
+
+        self._reserve(samples.shape[0] * 2 + WAV_HEADER_BYTES)
+        file_path = self.path / name
+        sf.write(file_path, samples, sample_rate, subtype="PCM_16")
+        return file_path
+
+    def cleanup(self) -> None:
+        """Supprime le répertoire et libère la part de quota réservée."""
+
+        with self._lock:
+            path, self._path = self._path, None
+            reserved, self._reserved = self._reserved, 0
+        with ScratchSpace._usage_lock:
+            ScratchSpace._used_bytes -= reserved
+        if path is None:
+            return
+        if self.keep:
+            logger.info("Espace de travail conservé pour débogage: %s", path)
+            return
+        shutil.rmtree(path, ignore_errors=True)
+        logger.debug("Espace de travail %s supprimé", path)
+
+    def __enter__(self) -> "ScratchSpace":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.cleanup()
+
+    def _reserve(self, size: int) -> None:
+        """Réserve ``size`` octets dans le quota global ou lève une erreur."""
+
+        with ScratchSpace._usage_lock:
+            if ScratchSpace._used_bytes + size > self.quota_bytes:
+                raise ScratchQuotaExceeded(
+                    "Quota disque des fichiers temporaires audio atteint."
+                )
+            ScratchSpace._used_bytes += size
+        with self._lock:
+            self._reserved += size
+
+
+def purge_stale_scratch(root: Path, max_age_hours: float = 24.0) -> None:
+    """Supprime les répertoires de travail abandonnés (arrêt brutal d'un worker)."""
+
+    if not root.exists():
+        return
+    threshold = time.time() - max_age_hours * 3600
+    for entry in root.iterdir():
+        if entry.is_dir() and entry.stat().st_mtime < threshold:
+            shutil.rmtree(entry, ignore_errors=True)
+            logger.info("Répertoire temporaire obsolète supprimé: %s", entry)
@@ -0,0 +1,222 @@
+"""Découpage guidé par détection d'activité vocale (VAD) basée sur l'énergie."""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+Span = Tuple[int, int]
+
+# Histogramme des énergies de trame (dBFS) utilisé par l'estimation en flux du seuil.
+ENERGY_BINS_DB = np.linspace(-100.0, 10.0, 441)
+
+
+class SpeechChunker:
+    """Détecte les zones de parole et les regroupe en chunks de durée bornée.
+
+    Whisper complète chaque chunk à 30 s: les zones de parole consécutives sont
+    donc regroupées tant que le chunk tient dans ``max_chunk_seconds``, pauses
+    comprises, afin de minimiser le nombre de chunks. Seul un silence de plus de
+    ``max_gap_ms`` (suspension d'audience) clôt le chunk, ce qui limite les
+    hallucinations de Whisper sur les longs silences ; le signal d'un chunk reste
+    contigu afin que les timestamps Whisper se recalent par simple décalage.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        max_chunk_seconds: float,
+        frame_ms: int = 30,
+        margin_db: Optional[float] = None,
+        min_speech_ms: Optional[int] = None,
+        min_silence_ms: Optional[int] = None,
+        padding_ms: Optional[int] = None,
+        max_gap_ms: Optional[int] = None,
+    ) -> None:
+        config = settings.preprocessing
+        if min_speech_ms is None:
+            min_speech_ms = config.vad_min_speech_ms
+        if min_silence_ms is None:
+            min_silence_ms = config.vad_min_silence_ms
+        if padding_ms is None:
+            padding_ms = config.vad_padding_ms
+        if max_gap_ms is None:
+            max_gap_ms = config.vad_max_gap_ms
+        self.sample_rate = sample_rate
+        self.frame = max(1, sample_rate * frame_ms // 1000)
+        self.max_chunk = int(max_chunk_seconds * sample_rate)
+        self.margin_db = config.vad_margin_db if margin_db is None else margin_db
+        self.min_speech_frames = self._frames(min_speech_ms)
+        self.min_silence_frames = self._frames(min_silence_ms)
+        self.padding = padding_ms * sample_rate // 1000
+        self.max_gap = max_gap_ms * sample_rate // 1000
+
+    def estimate_threshold(self, samples: np.ndarray) -> Optional[float]:
+        """Calcule le seuil de parole à partir du plancher de bruit du signal.
+
+        Retourne ``None`` (tout est considéré comme parole) si le signal ne
+        présente pas d'écart net entre silence et parole.
+        """
+
+        energy = self._frame_energy_db(samples)
+        if energy.size == 0:
+            return None
+        return self._threshold(float(np.percentile(energy, 10)), float(np.percentile(energy, 95)))
+
+    def running_threshold(self) -> "RunningThreshold":
+        """Estimateur du seuil mis à jour bloc par bloc (mode flux)."""
+
+        return RunningThreshold(self)
+
+    def _threshold(self, floor: float, peak: float) -> Optional[float]:
+        """Seuil à ``margin_db`` au-dessus du plancher, si parole et silence se distinguent."""
+
+        if peak - floor < self.margin_db:
+            return None
+        return floor + self.margin_db
+
+    def split(self, samples: np.ndarray, threshold_db: Optional[float]) -> List[Span]:
+        """Retourne les bornes (en échantillons) des chunks de parole."""
+
+        regions = self.speech_regions(samples, threshold_db)
+        return self.pack(regions, samples)
+
+    def speech_regions(self, samples: np.ndarray, threshold_db: Optional[float]) -> List[Span]:
+        """Détecte les zones de parole, lissées et élargies d'une marge."""
+
+        total = samples.shape[0]
+        if threshold_db is None:
+            return [(0, total)] if total else []
+        voiced = self._frame_energy_db(samples) > threshold_db
+        runs = self._runs(voiced)
+        # Fusionne les zones de parole séparées par des silences trop courts.
+        merged: List[List[int]] = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < self.min_silence_frames:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        regions: List[Span] = []
+        for start, end in merged:
+            if end - start < self.min_speech_frames:
+                continue
+            region_start = max(0, start * self.frame - self.padding)
+            region_end = min(total, end * self.frame + self.padding)
+            if regions and region_start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], region_end)
+            else:
+                regions.append((region_start, region_end))
+        return regions
+
+    def pack(self, regions: List[Span], samples: np.ndarray) -> List[Span]:
+        """Regroupe les zones consécutives en chunks d'au plus ``max_chunk`` échantillons.
+
+        Une zone rejoint le chunk courant dès que l'ensemble tient dans
+        ``max_chunk`` échantillons, sauf si le silence qui les sépare dépasse
+        ``max_gap`` échantillons.
+        """
+
+        chunks: List[Span] = []
+        for start, end in regions:
+            for piece_start, piece_end in self._split_long(start, end, samples):
+                if (
+                    chunks
+                    and piece_start - chunks[-1][1] <= self.max_gap
+                    and piece_end - chunks[-1][0] <= self.max_chunk
+                ):
+                    chunks[-1] = (chunks[-1][0], piece_end)
+                else:
+                    chunks.append((piece_start, piece_end))
+        return chunks
+
+    @staticmethod
+    def speech_samples(regions: List[Span], start: int, end: int) -> int:
+        """Nombre d'échantillons de parole des ``regions`` compris dans [start, end)."""
+
+        return sum(
+            max(0, min(end, region_end) - max(start, region_start))
+            for region_start, region_end in regions
+        )
+
+    def _split_long(self, start: int, end: int, samples: np.ndarray) -> List[Span]:
+        """Coupe une zone trop longue au point le plus calme de la fin de chaque fenêtre."""
+
+        pieces: List[Span] = []
+        while end - start > self.max_chunk:
+            window_end = start + self.max_chunk
+            search_start = window_end - self.max_chunk // 4
+            energy = self._frame_energy_db(samples[search_start:window_end])
+            cut = search_start + int(np.argmin(energy)) * self.frame if energy.size else window_end
+            cut = max(cut, start + self.frame)
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+        return pieces
+
+    def _frame_energy_db(self, samples: np.ndarray) -> np.ndarray:
+        """Énergie RMS par trame, en dBFS."""
+
+        n_frames = samples.shape[0] // self.frame
+        if n_frames == 0:
+            return np.empty(0, dtype=np.float32)
+        frames = samples[: n_frames * self.frame].reshape(n_frames, self.frame)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-10))
+
+    @staticmethod
+    def _runs(mask: np.ndarray) -> List[Span]:
+        """Retourne les intervalles [début, fin) où le masque vaut vrai."""
+
+        padded = np.concatenate(([False], mask, [False]))
+        changes = np.flatnonzero(padded[1:] != padded[:-1])
+        return [(int(start), int(end)) for start, end in zip(changes[::2], changes[1::2])]
+
+    def _frames(self, milliseconds: int) -> int:
+        """Convertit une durée en nombre de trames."""
+
+        return max(0, milliseconds * self.sample_rate // 1000 // self.frame)
+
+
+class RunningThreshold:
+    """Seuil de parole estimé sur tous les blocs déjà vus, à mémoire constante.
+
+    Les énergies de trame sont cumulées dans un histogramme ; le plancher de
+    bruit et le niveau de parole en sont les percentiles, comme pour
+    ``SpeechChunker.estimate_threshold`` sur un signal complet.
+    """
+
+    def __init__(self, chunker: SpeechChunker) -> None:
+        self.chunker = chunker
+        self.counts = np.zeros(ENERGY_BINS_DB.size - 1, dtype=np.int64)
+
+    def update(self, samples: np.ndarray) -> Optional[float]:
+        """Ajoute les trames d'un bloc et retourne le seuil courant."""
+
+        energy = self.chunker._frame_energy_db(samples)
+        clipped = np.clip(energy, ENERGY_BINS_DB[0], ENERGY_BINS_DB[-1] - 1e-6)
+        self.counts += np.histogram(clipped, bins=ENERGY_BINS_DB)[0]
+        total = int(self.counts.sum())
+        if total == 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        floor, peak = (
+            float(ENERGY_BINS_DB[int(np.searchsorted(cumulative, total * quantile)) + 1])
+            for quantile in (0.10, 0.95)
+        )
+        return self.chunker._threshold(floor, peak)
+
+
+def log_skipped_audio(total_samples: int, kept_samples: int, sample_rate: int) -> float:
+    """Journalise et retourne la durée de silence écartée, en secondes."""
+
+    kept = kept_samples
+    skipped = (total_samples - kept) / sample_rate
+    logger.info(
+        "VAD: %.1f s de parole conservés, %.1f s de silence écartés",
+        kept / sample_rate,
+        skipped,
+    )
+    return skipped
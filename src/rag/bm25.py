@@ -0,0 +1,102 @@
+"""Index lexical BM25 sur les articles de loi (texte, mots-clés, numéro d'article)."""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.rag.legal_rag import LegalArticle
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes normalisés (minuscules, sans accents ni diacritiques)."""
+
+    normalized = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in normalized if not unicodedata.combining(char))
+    return _TOKEN_PATTERN.findall(stripped)
+
+
+class BM25Index:
+    """Index inversé BM25 aligné sur l'ordre des lignes de l'index dense.
+
+    Les poids BM25 de chaque couple (terme, article) sont précalculés: une
+    requête se résume à additionner les listes de postings de ses termes.
+    """
+
+    def __init__(self, articles: Sequence["LegalArticle"], k1: float = 1.5, b: float = 0.75) -> None:
+        self.size = len(articles)
+        documents = [self._document_terms(article) for article in articles]
+        lengths = np.array([len(terms) for terms in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for row, terms in enumerate(documents):
+            for term, frequency in Counter(terms).items():
+                postings[term].append((row, frequency))
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            rows = np.array([row for row, _ in entries], dtype=np.int64)
+            frequencies = np.array([frequency for _, frequency in entries], dtype=np.float32)
+            idf = math.log(1.0 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = k1 * (1.0 - b + b * lengths[rows] / average_length)
+            self._postings[term] = (rows, idf * frequencies * (k1 + 1.0) / (frequencies + norm))
+
+        categories: Dict[str, List[int]] = defaultdict(list)
+        for row, article in enumerate(articles):
+            categories[article.category.casefold()].append(row)
+        self._categories = {
+            category: np.array(rows, dtype=np.int64) for category, rows in categories.items()
+        }
+
+    def category_rows(self, category: Optional[str]) -> Optional[np.ndarray]:
+        """Lignes des articles de la catégorie, ou ``None`` si elle est inconnue."""
+
+        if not category:
+            return None
+        return self._categories.get(category.casefold())
+
+    def search(
+        self, query: str, limit: int, rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Retourne les meilleures lignes ``(ligne, score)`` pour la requête.
+
+        Args:
+            query: Texte de la requête.
+            limit: Nombre maximal de résultats.
+            rows: Restreint la recherche à ces lignes (pré-filtrage par catégorie).
+        """
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        matched = False
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+                matched = True
+        if not matched:
+            return []
+        candidates = np.flatnonzero(scores) if rows is None else rows[scores[rows] > 0]
+        if candidates.size > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(row), float(scores[row])) for row in ordered]
+
+    @staticmethod
+    def _document_terms(article: "LegalArticle") -> List[str]:
+        """Termes indexés: texte, mots-clés (comptés deux fois), code et numéro d'article."""
+
+        keywords = tokenize(" ".join(article.keywords))
+        return (
+            tokenize(article.text)
+            + keywords * 2
+            + tokenize(article.code)
+            + tokenize(article.article)
+        )
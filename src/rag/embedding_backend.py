@@ -0,0 +1,182 @@
+"""Backends d'encodage des phrases: PyTorch, ONNX Runtime ou ONNX quantifié int8."""
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Sequence
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model-int8.onnx"
+ONNX_CONFIG_FILE = "encoder.json"
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Répertoire de cache de l'export ONNX d'un modèle sous ``models/embeddings``."""
+
+    safe_name = re.sub(r"[^\w.-]+", "__", model_name)
+    return settings.paths.models_dir / "embeddings" / "onnx" / safe_name
+
+
+def load_sentence_transformer(model_name: str) -> SentenceTransformer:
+    """Charge le modèle sentence-transformers PyTorch."""
+
+    from sentence_transformers import SentenceTransformer  # import local pour accélérer le chargement global
+
+    return SentenceTransformer(
+        model_name,
+        cache_folder=str(settings.paths.models_dir / "embeddings"),
+        use_auth_token=settings.api.huggingface_token,
+    )
+
+
+def load_encoder(
+    backend: str | None = None, model_name: str | None = None
+) -> SentenceTransformer | OnnxSentenceEncoder:
+    """Instancie l'encodeur configuré (``EMBEDDING_BACKEND``).
+
+    Les deux types d'encodeurs exposent ``encode(texts, normalize_embeddings=True)``.
+    L'export ONNX et la quantification sont réalisés au premier chargement puis
+    réutilisés depuis le cache.
+    """
+
+    backend = backend or settings.models.embedding_backend
+    model_name = model_name or settings.models.sentence_embedding_model
+    if backend == "torch":
+        return load_sentence_transformer(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        model_path = ensure_onnx_model(model_name, quantized=backend == "onnx-int8")
+        return OnnxSentenceEncoder(model_path)
+    raise ValueError(f"Backend d'embedding inconnu: {backend}")
+
+
+def ensure_onnx_model(model_name: str, quantized: bool = False) -> Path:
+    """Retourne le fichier ONNX du modèle, en l'exportant ou le quantifiant si besoin."""
+
+    output_dir = onnx_model_dir(model_name)
+    model_path = output_dir / ONNX_MODEL_FILE
+    if not model_path.exists():
+        export_onnx(model_name, output_dir)
+    if not quantized:
+        return model_path
+    int8_path = output_dir / ONNX_INT8_MODEL_FILE
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Quantification dynamique int8 de %s", model_path)
+        tmp_path = output_dir / f"model-int8.{os.getpid()}.tmp.onnx"
+        quantize_dynamic(str(model_path), str(tmp_path), weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    return int8_path
+
+
+def export_onnx(model_name: str, output_dir: Path) -> None:
+    """Exporte le transformer du modèle en ONNX avec son tokenizer.
+
+    Seule la partie transformer est exportée (sortie ``last_hidden_state``):
+    le mean pooling et la normalisation sont appliqués côté numpy.
+    """
+
+    import torch
+
+    model = load_sentence_transformer(model_name)
+    pooling = model[1].get_pooling_mode_str() if len(model) > 1 else ""
+    if pooling != "mean":
+        raise ValueError(f"Pooling non supporté pour l'export ONNX: {pooling or 'aucun'}")
+    transformer = model[0]
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, auto_model: torch.nn.Module) -> None:
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+            return self.auto_model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sample = transformer.tokenizer(["audience du tribunal"], return_tensors="pt")
+    tmp_path = output_dir / f"model.{os.getpid()}.tmp.onnx"
+    logger.info("Export ONNX de %s vers %s", model_name, output_dir)
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer.auto_model.eval()),
+            (sample["input_ids"], sample["attention_mask"]),
+            str(tmp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    transformer.tokenizer.save_pretrained(str(output_dir))
+    with open(output_dir / ONNX_CONFIG_FILE, "w", encoding="utf-8") as config_file:
+        json.dump({"model": model_name, "max_seq_length": model.max_seq_length}, config_file)
+    # Le modèle est publié en dernier: sa présence valide l'export complet.
+    os.replace(tmp_path, output_dir / ONNX_MODEL_FILE)
+
+
+class OnnxSentenceEncoder:
+    """Encodeur de phrases exécuté par ONNX Runtime sur CPU (mean pooling)."""
+
+    def __init__(self, model_path: Path) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = model_path.parent
+        with open(model_dir / ONNX_CONFIG_FILE, "r", encoding="utf-8") as config_file:
+            self.max_seq_length = int(json.load(config_file)["max_seq_length"])
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        logger.info("Encodeur ONNX chargé depuis %s", model_path)
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **_: object,
+    ) -> np.ndarray:
+        """Encode les textes par lots triés par longueur pour limiter le padding."""
+
+        order = sorted(range(len(texts)), key=lambda position: len(texts[position]))
+        vectors: List[np.ndarray] = [np.empty(0, dtype=np.float32)] * len(texts)
+        for offset in range(0, len(order), batch_size):
+            positions = order[offset : offset + batch_size]
+            tokens = self.tokenizer(
+                [texts[position] for position in positions],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            mask = tokens["attention_mask"].astype(np.int64)
+            hidden = self.session.run(
+                None,
+                {"input_ids": tokens["input_ids"].astype(np.int64), "attention_mask": mask},
+            )[0]
+            weights = mask[..., np.newaxis].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for position, vector in zip(positions, pooled):
+                vectors[position] = vector
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors).astype(np.float32)
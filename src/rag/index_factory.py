@@ -0,0 +1,154 @@
+"""Fabrique d'index FAISS (Flat, IVF-Flat, HNSW, IVF-PQ) pour le RAG juridique."""
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+# FAISS recommande au moins ~39 vecteurs d'entraînement par centroïde.
+MIN_POINTS_PER_CENTROID = 39
+
+
+def index_signature() -> Dict[str, object]:
+    """Paramètres de construction: tout changement impose de reconstruire l'index."""
+
+    models = settings.models
+    signature: Dict[str, object] = {"type": models.rag_index_type}
+    if models.rag_index_type in ("ivf_flat", "ivf_pq"):
+        signature["nlist"] = models.rag_ivf_nlist
+    if models.rag_index_type == "ivf_pq":
+        signature["pq_m"] = models.rag_pq_m
+        signature["pq_nbits"] = models.rag_pq_nbits
+    if models.rag_index_type == "hnsw":
+        signature["hnsw_m"] = models.rag_hnsw_m
+        signature["ef_construction"] = models.rag_ef_construction
+    return signature
+
+
+def build_index(
+    embeddings: np.ndarray, ids: np.ndarray, index_type: Optional[str] = None
+) -> faiss.Index:
+    """Construit, entraîne si nécessaire et remplit l'index configuré.
+
+    Args:
+        embeddings: Vecteurs normalisés (produit scalaire = cosinus).
+        ids: Identifiants int64 associés à chaque vecteur.
+        index_type: Type d'index, par défaut ``RAG_INDEX_TYPE``.
+
+    Returns:
+        Un index supportant ``add_with_ids`` et configuré pour la recherche.
+    """
+
+    models = settings.models
+    index_type = index_type or models.rag_index_type
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Type d'index FAISS inconnu: {index_type}")
+    count, dimension = embeddings.shape
+    vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nlist = _resolve_nlist(count)
+        if index_type == "ivf_pq":
+            # Les sous-quantificateurs PQ apprennent aussi 2^nbits centroïdes chacun.
+            pq_points = max(nlist, 1 << models.rag_pq_nbits) * MIN_POINTS_PER_CENTROID
+            if count < pq_points:
+                logger.warning(
+                    "Corpus trop petit (%s vecteurs, %s requis) pour un index ivf_pq, repli sur ivf_flat",
+                    count,
+                    pq_points,
+                )
+                index_type = "ivf_flat"
+        if index_type == "ivf_flat" and count < nlist * MIN_POINTS_PER_CENTROID:
+            logger.warning(
+                "Corpus trop petit (%s vecteurs) pour un index ivf_flat, repli sur Flat", count
+            )
+            index_type = "flat"
+
+    if index_type == "flat":
+        index: faiss.Index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    elif index_type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dimension, models.rag_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = models.rag_ef_construction
+        index = faiss.IndexIDMap2(hnsw)
+    else:
+        quantizer = faiss.IndexFlatIP(dimension)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            if dimension % models.rag_pq_m:
+                raise ValueError("RAG_PQ_M doit diviser la dimension des embeddings.")
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                dimension,
+                nlist,
+                models.rag_pq_m,
+                models.rag_pq_nbits,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        logger.info("Entraînement de l'index %s (%s listes)", index_type, nlist)
+        index.train(vectors)
+
+    index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+    configure_search(index)
+    logger.info("Index FAISS %s construit (%s vecteurs, dimension %s)", index_type, count, dimension)
+    return index
+
+
+def configure_search(index: faiss.Index) -> None:
+    """Applique les paramètres de recherche (nprobe, efSearch) à un index chargé ou construit."""
+
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = settings.models.rag_nprobe
+    if isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = settings.models.rag_ef_search
+
+
+def supports_filtered_search(index: faiss.Index) -> bool:
+    """Indique si ``search`` accepte un sélecteur d'identifiants pour cet index.
+
+    Avec faiss-cpu 1.7.4, ``IndexIDMap`` (index ``flat`` et ``hnsw``) rejette
+    tout paramètre de recherche ; seuls les index IVF, qui stockent eux-mêmes
+    les identifiants, filtrent pendant la recherche.
+    """
+
+    return not isinstance(index, faiss.IndexIDMap)
+
+
+def filtered_search_parameters(index: faiss.Index, ids: np.ndarray) -> faiss.SearchParameters:
+    """Paramètres de recherche restreignant les résultats aux identifiants ``ids``.
+
+    Réservé aux index pour lesquels ``supports_filtered_search`` est vrai. Le sélecteur est accompagné des réglages ``nprobe``/``efSearch`` configurés,
+    que les paramètres passés à ``search`` remplacent sinon par leurs défauts.
+    """
+
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    # Table de hachage: appartenance testée en O(1), contrairement à IDSelectorArray.
+    selector = faiss.IDSelectorBatch(np.ascontiguousarray(ids, dtype=np.int64))
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=settings.models.rag_nprobe)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=settings.models.rag_ef_search)
+    return faiss.SearchParameters(sel=selector)
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    """Indique si l'index accepte ``remove_ids`` (HNSW ne le permet pas)."""
+
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    return not isinstance(inner, faiss.IndexHNSW)
+
+
+def _resolve_nlist(count: int) -> int:
+    """Nombre de listes IVF: valeur configurée ou ~4·√N par défaut."""
+
+    configured = settings.models.rag_ivf_nlist
+    if configured > 0:
+        return configured
+    return max(1, min(int(4 * math.sqrt(count)), count // MIN_POINTS_PER_CENTROID))
@@ -1,17 +1,43 @@
 """Système RAG pour la recherche d'articles de loi pertinents."""
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
 from loguru import logger
-from sentence_transformers import SentenceTransformer
 
 from config import settings
+from src.rag.bm25 import BM25Index
+from src.rag.embedding_backend import OnnxSentenceEncoder, load_encoder
+from src.rag.index_factory import (
+    build_index,
+    configure_search,
+    filtered_search_parameters,
+    index_signature,
+    supports_filtered_search,
+    supports_removal,
+)
+from src.rag.query_cache import QueryCache, normalize_query
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: un seul processus par déploiement
+    fcntl = None
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Intervalle minimal entre deux vérifications de l'index publié par un autre processus.
+RELOAD_CHECK_SECONDS = 1.0
 
 
 @dataclass
@@ -24,52 +50,478 @@ class LegalArticle:
     category: str
     keywords: List[str]
 
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Clé fonctionnelle de l'article: (code, numéro d'article)."""
+
+        return (self.code, self.article)
+
+
+def article_id(code: str, article: str) -> int:
+    """Identifiant FAISS stable (int64 positif) dérivé de la clé (code, article)."""
+
+    digest = hashlib.sha1(f"{code}\x1f{article}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & ((1 << 63) - 1)
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    """Instantané immuable servi aux recherches.
+
+    Les mises à jour construisent un nouvel instantané puis remplacent la
+    référence en une seule affectation: une recherche en cours ne voit jamais
+    un index à moitié modifié.
+    """
+
+    index: faiss.Index
+    articles: Dict[int, LegalArticle]
+    ids: np.ndarray
+    embeddings: np.ndarray
+    version: int
+    bm25: BM25Index = field(init=False, repr=False)
+    rows: Dict[int, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Index lexical et correspondance id -> ligne alignés sur ``ids``/``embeddings``.
+        ordered = [self.articles[int(identifier)] for identifier in self.ids]
+        object.__setattr__(self, "bm25", BM25Index(ordered))
+        object.__setattr__(
+            self, "rows", {int(identifier): row for row, identifier in enumerate(self.ids)}
+        )
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """Fusionne des classements par RRF: score = somme de 1 / (k + rang)."""
+
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=fused.__getitem__, reverse=True)
+
 
 class LegalRAG:
     """Construit un index FAISS et effectue des recherches sémantiques."""
 
-    def __init__(self, corpus_path: Path | None = None) -> None:
+    def __init__(self, corpus_path: Path | None = None, index_dir: Path | None = None) -> None:
         self.corpus_path = corpus_path or (settings.paths.data_dir / "corpus" / "legal_corpus.json")
-        self.articles: List[LegalArticle] = []
-        self.embeddings: np.ndarray | None = None
-        self.index: faiss.IndexFlatIP | None = None
+        self.index_dir = index_dir or (settings.paths.models_dir / "rag")
+        self._write_lock = threading.Lock()
+        # Les embeddings ne dépendent que du texte normalisé ; les résultats
+        # sont en plus indexés par la version de l'index servi.
+        self._embedding_cache: QueryCache[np.ndarray] = QueryCache(
+            settings.models.rag_cache_size, settings.models.rag_cache_ttl_seconds
+        )
+        self._result_cache: QueryCache[List[Tuple[LegalArticle, float]]] = QueryCache(
+            settings.models.rag_cache_size, settings.models.rag_cache_ttl_seconds
+        )
         self.model = self._load_model()
-        self._load_corpus()
-        self._build_index()
+        # Plusieurs workers partagent le corpus et l'index persistés: un seul les construit.
+        with self._file_lock(exclusive=True):
+            articles = self._load_corpus()
+            corpus_hash = self._corpus_hash()
+            state = self._load_index(corpus_hash, articles)
+            if state is None:
+                # Version publiée conservée: les autres workers voient la reconstruction.
+                state = self._build_index(articles, max(0, self._disk_version()))
+                self._save_index(state, corpus_hash)
+            self._metadata_mtime = self._metadata_stamp()
+        self._checked_at = time.monotonic()
+        self._state = state
+
+    @property
+    def articles(self) -> List[LegalArticle]:
+        """Articles actuellement indexés."""
+
+        return list(self._state.articles.values())
+
+    @property
+    def index(self) -> faiss.Index:
+        """Index FAISS actuellement servi."""
 
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[LegalArticle, float]]:
-        """Recherche les articles les plus pertinents pour la requête donnée."""
+        return self._state.index
+
+    @property
+    def version(self) -> int:
+        """Version de l'index, incrémentée à chaque mise à jour du corpus."""
+
+        return self._state.version
+
+    def search(
+        self, query: str, top_k: int = 5, category: Optional[str] = None
+    ) -> List[Tuple[LegalArticle, float]]:
+        """Recherche les articles les plus pertinents pour la requête donnée.
+
+        Args:
+            query: Texte de la requête.
+            top_k: Nombre d'articles retournés.
+            category: Catégorie de l'affaire ; si elle existe dans le corpus,
+                seuls ses articles sont considérés.
+
+        Returns:
+            Couples (article, similarité cosinus). En mode hybride, l'ordre est
+            celui de la fusion RRF des classements dense et BM25.
+        """
 
         if not query.strip():
             raise ValueError("La requête de recherche ne peut pas être vide.")
-        if self.index is None or self.embeddings is None:
-            raise RuntimeError("L'index FAISS n'a pas été initialisé.")
-
-        query_embedding = self._embed_texts([query])
-        scores, indices = self.index.search(query_embedding, top_k)
-        results: List[Tuple[LegalArticle, float]] = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx == -1:
+        return self.search_many([query], top_k, category)[0]
+
+    def search_many(
+        self, queries: Sequence[str], top_k: int = 5, category: Optional[str] = None
+    ) -> List[List[Tuple[LegalArticle, float]]]:
+        """Recherche plusieurs requêtes avec un seul encodage et une seule recherche FAISS.
+
+        Les requêtes absentes du cache sont encodées en un unique lot, puis
+        classées ensemble sur le même instantané de l'index. La forme
+        normalisée d'une requête ne sert que de clé de cache: le modèle encode
+        le texte d'origine (première occurrence de chaque forme normalisée).
+
+        Returns:
+            Une liste de résultats par requête, dans l'ordre des requêtes.
+        """
+
+        if any(not query.strip() for query in queries):
+            raise ValueError("La requête de recherche ne peut pas être vide.")
+        self._refresh()
+        state = self._state
+        if not queries or state.index.ntotal == 0:
+            return [[] for _ in queries]
+
+        models = settings.models
+        normalized = [normalize_query(query) for query in queries]
+        keys = [
+            (query, top_k, category, models.rag_hybrid_search, state.version)
+            for query in normalized
+        ]
+        results: List[Optional[List[Tuple[LegalArticle, float]]]] = [
+            self._result_cache.get(key) for key in keys
+        ]
+        # Requêtes à classer, dédoublonnées en conservant l'ordre, avec leur texte d'origine.
+        originals: Dict[str, str] = {}
+        for query, original, cached in zip(normalized, queries, results):
+            if cached is None:
+                originals.setdefault(query, original)
+        pending = list(originals)
+        if pending:
+            embeddings: Dict[str, np.ndarray] = {}
+            for query in pending:
+                cached_embedding = self._embedding_cache.get(query)
+                if cached_embedding is not None:
+                    embeddings[query] = cached_embedding
+            missing = [query for query in pending if query not in embeddings]
+            if missing:
+                vectors = self._embed_texts([originals[query] for query in missing])
+                for query, vector in zip(missing, vectors):
+                    embeddings[query] = vector
+                    self._embedding_cache.put(query, vector)
+            ranked = self._rank_many(
+                state,
+                [originals[query] for query in pending],
+                np.stack([embeddings[query] for query in pending]),
+                top_k,
+                category,
+            )
+            fresh = dict(zip(pending, ranked))
+            for position, (query, key) in enumerate(zip(normalized, keys)):
+                if results[position] is None:
+                    results[position] = fresh[query]
+                    self._result_cache.put(key, fresh[query])
+        logger.debug("Recherche RAG de %s requêtes (%s encodées)", len(queries), len(pending))
+        return [list(result or []) for result in results]
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Compteurs des caches d'embeddings et de résultats de requêtes."""
+
+        return {
+            "embeddings": self._embedding_cache.stats(),
+            "results": self._result_cache.stats(),
+        }
+
+    def _rank_many(
+        self,
+        state: _IndexState,
+        queries: Sequence[str],
+        query_embeddings: np.ndarray,
+        top_k: int,
+        category: Optional[str],
+    ) -> List[List[Tuple[LegalArticle, float]]]:
+        """Classe les articles d'un instantané pour des requêtes déjà encodées."""
+
+        models = settings.models
+        rows = state.bm25.category_rows(category)
+        depth = max(top_k, models.rag_hybrid_candidates) if models.rag_hybrid_search else top_k
+        dense_rankings = self._dense_rankings(state, query_embeddings, depth, rows)
+        results = []
+        for query, query_embedding, ranked in zip(queries, query_embeddings, dense_rankings):
+            if models.rag_hybrid_search:
+                lexical = [row for row, _ in state.bm25.search(query, depth, rows)]
+                ranked = reciprocal_rank_fusion([ranked, lexical], models.rag_rrf_k)
+            selected = np.array(ranked[:top_k], dtype=np.int64)
+            if selected.size == 0:
+                results.append([])
                 continue
-            article = self.articles[int(idx)]
-            results.append((article, float(score)))
-        logger.debug("Recherche RAG renvoie %s résultats", len(results))
+            similarities = np.asarray(state.embeddings[selected]) @ query_embedding
+            results.append(
+                [
+                    (state.articles[int(state.ids[row])], float(score))
+                    for row, score in zip(selected, similarities)
+                ]
+            )
         return results
 
-    def _load_model(self) -> SentenceTransformer:
-        """Charge le modèle d'embedding sentence-transformers."""
+    @staticmethod
+    def _dense_rankings(
+        state: _IndexState, query_embeddings: np.ndarray, depth: int, rows: Optional[np.ndarray]
+    ) -> List[List[int]]:
+        """Lignes classées par similarité dense pour chaque requête.
 
-        try:
-            return SentenceTransformer(
-                settings.models.sentence_embedding_model,
-                cache_folder=str(settings.paths.models_dir / "embeddings"),
-                use_auth_token=settings.api.huggingface_token,
+        Un sous-ensemble pré-filtré d'au plus ``RAG_FILTER_EXACT_MAX`` articles
+        est scoré exactement sur les embeddings (un seul produit matriciel) ;
+        au-delà, un index IVF (``ivf_flat``, ``ivf_pq``) est interrogé avec un
+        sélecteur limité aux identifiants du sous-ensemble. Les index ``flat``
+        et ``hnsw``, enveloppés dans un ``IndexIDMap`` qui n'accepte pas de
+        sélecteur, restent scorés exactement.
+        """
+
+        queries = np.ascontiguousarray(query_embeddings)
+        if rows is None or (
+            rows.size > settings.models.rag_filter_exact_max
+            and supports_filtered_search(state.index)
+        ):
+            params = (
+                None if rows is None else filtered_search_parameters(state.index, state.ids[rows])
+            )
+            _, indices = state.index.search(queries, depth, params=params)
+            return [[state.rows[int(idx)] for idx in row if idx != -1] for row in indices]
+        scores = query_embeddings @ np.asarray(state.embeddings[rows]).T
+        rankings = []
+        for query_scores in scores:
+            if rows.size > depth:
+                best = np.argpartition(-query_scores, depth - 1)[:depth]
+            else:
+                best = np.arange(rows.size)
+            best = best[np.argsort(-query_scores[best], kind="stable")]
+            rankings.append([int(row) for row in rows[best]])
+        return rankings
+
+    def upsert_articles(self, articles: Sequence[LegalArticle]) -> int:
+        """Ajoute ou remplace des articles en n'encodant que ceux-ci.
+
+        Seuls les articles modifiés sont encodés et, lorsque l'index le permet,
+        insérés dans une copie de l'index. La matrice d'embeddings du nouvel
+        instantané est en revanche recopiée une fois (O(N·d)), comme l'index
+        BM25 est reconstruit : l'instantané courant reste ainsi intact pour les
+        recherches en cours. Après la sauvegarde, l'instantané publié est
+        remappé sur le fichier persisté, ce qui rend la copie privée temporaire.
+
+        Returns:
+            La nouvelle version de l'index.
+        """
+
+        unique = {article_id(*article.key): article for article in articles}
+        if not unique:
+            return self.version
+        with self._write_lock, self._file_lock(exclusive=True):
+            state = self._synced_state()
+            ids = np.fromiter(unique.keys(), dtype=np.int64, count=len(unique))
+            vectors = self._embed_texts([article.text for article in unique.values()])
+            keep = ~np.isin(state.ids, ids)
+            all_ids = np.concatenate((state.ids[keep], ids))
+            all_embeddings = self._merged_embeddings(state.embeddings, keep, vectors)
+            new_state = _IndexState(
+                index=self._updated_index(state.index, ids, vectors, ids, all_embeddings, all_ids),
+                articles={**state.articles, **unique},
+                ids=all_ids,
+                embeddings=all_embeddings,
+                version=state.version + 1,
+            )
+            self._commit(new_state)
+        logger.info("%s articles ajoutés ou mis à jour", len(unique))
+        return new_state.version
+
+    def delete_articles(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Supprime des articles identifiés par (code, article).
+
+        Comme ``upsert_articles``, recopie une fois les embeddings conservés.
+
+        Returns:
+            Le nombre d'articles effectivement supprimés.
+        """
+
+        with self._write_lock, self._file_lock(exclusive=True):
+            state = self._synced_state()
+            ids = np.array(
+                [article_id(code, article) for code, article in keys], dtype=np.int64
+            )
+            ids = ids[np.isin(ids, state.ids)]
+            if ids.size == 0:
+                return 0
+            keep = ~np.isin(state.ids, ids)
+            removed = set(ids.tolist())
+            all_ids = state.ids[keep]
+            empty = np.empty((0, state.embeddings.shape[1]), dtype=np.float32)
+            all_embeddings = self._merged_embeddings(state.embeddings, keep, empty)
+            new_state = _IndexState(
+                index=self._updated_index(
+                    state.index, ids, empty, ids[:0], all_embeddings, all_ids
+                ),
+                articles={
+                    key: article for key, article in state.articles.items() if key not in removed
+                },
+                ids=all_ids,
+                embeddings=all_embeddings,
+                version=state.version + 1,
             )
+            self._commit(new_state)
+        logger.info("%s articles supprimés", len(removed))
+        return len(removed)
+
+    @staticmethod
+    def _merged_embeddings(
+        embeddings: np.ndarray, keep: np.ndarray, vectors: np.ndarray
+    ) -> np.ndarray:
+        """Lignes conservées suivies des nouveaux vecteurs, en une seule copie."""
+
+        kept = int(np.count_nonzero(keep))
+        merged = np.empty((kept + vectors.shape[0], embeddings.shape[1]), dtype=np.float32)
+        np.compress(keep, embeddings, axis=0, out=merged[:kept])
+        merged[kept:] = vectors
+        return merged
+
+    @staticmethod
+    def _updated_index(
+        index: faiss.Index,
+        remove_ids: np.ndarray,
+        add_vectors: np.ndarray,
+        add_ids: np.ndarray,
+        all_embeddings: np.ndarray,
+        all_ids: np.ndarray,
+    ) -> faiss.Index:
+        """Applique une mise à jour sur une copie de l'index.
+
+        Les index qui ne supportent pas la suppression (HNSW) ou la copie
+        (listes IVF sur disque) sont reconstruits à partir des embeddings
+        conservés, sans ré-encoder le corpus.
+        """
+
+        if supports_removal(index):
+            try:
+                updated = faiss.clone_index(index)
+                if remove_ids.size:
+                    updated.remove_ids(remove_ids)
+                if add_ids.size:
+                    updated.add_with_ids(add_vectors, add_ids)
+                configure_search(updated)
+                return updated
+            except RuntimeError as exc:
+                logger.warning("Mise à jour en place impossible (%s), reconstruction", exc)
+        return build_index(all_embeddings, all_ids)
+
+    def _commit(self, state: _IndexState) -> None:
+        """Persiste le corpus et l'index puis publie le nouvel instantané.
+
+        Une fois sauvegardés, ses embeddings sont remplacés par le fichier en
+        mémoire mappée: la copie privée construite par la mise à jour est
+        libérée et les pages redeviennent partagées entre processus.
+        """
+
+        self._write_corpus(state)
+        if self._save_index(state, self._corpus_hash()):
+            # Instantané pas encore publié: le modifier ne peut affecter aucune recherche.
+            object.__setattr__(
+                state, "embeddings", np.load(self.index_dir / "embeddings.npy", mmap_mode="r")
+            )
+        self._state = state
+        self._metadata_mtime = self._metadata_stamp()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Verrou inter-processus sur le corpus et l'index persistés (``flock``)."""
+
+        if fcntl is None:
+            yield
+            return
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / "index.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _metadata_stamp(self) -> Optional[int]:
+        """Date de modification des métadonnées persistées (``None`` si absentes)."""
+
+        try:
+            return (self.index_dir / "metadata.json").stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _disk_version(self) -> int:
+        """Version de l'index persisté, ``-1`` si elle est illisible."""
+
+        try:
+            with open(self.index_dir / "metadata.json", "r", encoding="utf-8") as metadata_file:
+                return int(json.load(metadata_file).get("version", -1))
+        except (OSError, ValueError):
+            return -1
+
+    def _synced_state(self) -> _IndexState:
+        """Instantané à jour de l'index persisté (appelé sous verrou de fichier).
+
+        Un autre worker a pu publier une version plus récente: elle est
+        rechargée avant d'appliquer la mise à jour, afin de ne pas l'écraser.
+        Si l'index persisté est illisible, il est reconstruit sous la version
+        publiée puis sauvegardé, pour que les versions restent croissantes.
+        """
+
+        disk_version = self._disk_version()
+        if disk_version > self._state.version:
+            articles = self._load_corpus()
+            corpus_hash = self._corpus_hash()
+            state = self._load_index(corpus_hash, articles)
+            if state is None:
+                state = self._build_index(articles, max(disk_version, self._state.version))
+                self._save_index(state, corpus_hash)
+            self._state = state
+            self._metadata_mtime = self._metadata_stamp()
+            logger.info("Index publié par un autre processus rechargé (version %s)", state.version)
+        return self._state
+
+    def _refresh(self) -> None:
+        """Recharge l'index si un autre processus en a publié une nouvelle version."""
+
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        if self._metadata_stamp() == self._metadata_mtime:
+            return
+        # Une écriture locale en cours publiera elle-même la dernière version.
+        if not self._write_lock.acquire(blocking=False):
+            return
+        try:
+            # Verrou exclusif: un index illisible est reconstruit et sauvegardé par
+            # ``_synced_state``, ce qu'un autre processus ne doit pas faire en même temps.
+            with self._file_lock(exclusive=True):
+                self._synced_state()
+                self._metadata_mtime = self._metadata_stamp()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Rechargement de l'index publié impossible: %s", exc)
+        finally:
+            self._write_lock.release()
+
+    def _load_model(self) -> SentenceTransformer | OnnxSentenceEncoder:
+        """Charge le modèle d'embedding avec le backend configuré (``EMBEDDING_BACKEND``)."""
+
+        try:
+            return load_encoder()
         except Exception as exc:  # noqa: BLE001
             logger.exception("Impossible de charger le modèle d'embedding: %s", exc)
             raise
 
-    def _load_corpus(self) -> None:
+    def _load_corpus(self) -> Dict[int, LegalArticle]:
         """Lit le corpus JSON depuis le disque et crée les objets articles."""
 
         try:
@@ -82,29 +534,164 @@ class LegalRAG:
             logger.error("Format de corpus invalide: %s", exc)
             raise
 
-        self.articles = [
-            LegalArticle(
+        articles: Dict[int, LegalArticle] = {}
+        for entry in entries:
+            article = LegalArticle(
                 code=str(entry.get("code", "")),
                 article=str(entry.get("article", "")),
                 text=str(entry.get("text", "")),
                 category=str(entry.get("category", "")),
                 keywords=list(entry.get("keywords", [])),
             )
-            for entry in entries
-        ]
-        logger.info("%s articles juridiques chargés", len(self.articles))
+            identifier = article_id(*article.key)
+            if identifier in articles:
+                logger.warning("Article en double dans le corpus: %s", article.key)
+            articles[identifier] = article
+        logger.info("%s articles juridiques chargés", len(articles))
+        return articles
+
+    def _write_corpus(self, state: _IndexState) -> None:
+        """Réécrit le corpus JSON de façon atomique après une mise à jour."""
 
-    def _build_index(self) -> None:
-        """Construit l'index FAISS en mémoire à partir des embeddings."""
+        tmp_path = self.corpus_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as corpus_file:
+            json.dump(
+                [asdict(article) for article in state.articles.values()],
+                corpus_file,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, self.corpus_path)
+
+    def _build_index(self, articles: Dict[int, LegalArticle], version: int = 0) -> _IndexState:
+        """Construit l'index FAISS en mémoire à partir des embeddings, sous ``version``."""
 
-        if not self.articles:
+        if not articles:
             raise ValueError("Aucun article chargé pour construire l'index.")
-        texts = [article.text for article in self.articles]
-        self.embeddings = self._embed_texts(texts)
-        dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)
-        self.index.add(self.embeddings)
-        logger.info("Index FAISS construit avec dimension %s", dimension)
+        ids = np.fromiter(articles.keys(), dtype=np.int64, count=len(articles))
+        embeddings = self._embed_texts([article.text for article in articles.values()])
+        index = build_index(embeddings, ids)
+        return _IndexState(
+            index=index, articles=articles, ids=ids, embeddings=embeddings, version=version
+        )
+
+    def _corpus_hash(self) -> str:
+        """Empreinte du corpus, du modèle et du backend: toute modification invalide l'index."""
+
+        digest = hashlib.sha256()
+        digest.update(settings.models.sentence_embedding_model.encode("utf-8"))
+        if settings.models.embedding_backend != "torch":
+            # Backend PyTorch omis: les index déjà persistés restent valides.
+            digest.update(settings.models.embedding_backend.encode("utf-8"))
+        with open(self.corpus_path, "rb") as corpus_file:
+            for block in iter(lambda: corpus_file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_index(
+        self, corpus_hash: str, articles: Dict[int, LegalArticle]
+    ) -> _IndexState | None:
+        """Charge l'index et les embeddings persistés s'ils correspondent au corpus.
+
+        L'index est ouvert en mémoire mappée lorsque FAISS le permet et les
+        embeddings via ``np.load(mmap_mode="r")``: les pages ne sont lues qu'à
+        l'usage et partagées entre processus.
+        """
+
+        metadata_path = self.index_dir / "metadata.json"
+        index_path = self.index_dir / "index.faiss"
+        embeddings_path = self.index_dir / "embeddings.npy"
+        ids_path = self.index_dir / "ids.npy"
+        paths = (metadata_path, index_path, embeddings_path, ids_path)
+        if not all(path.exists() for path in paths):
+            return None
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as metadata_file:
+                metadata = json.load(metadata_file)
+            if metadata.get("corpus_hash") != corpus_hash:
+                logger.info("Corpus modifié depuis la dernière indexation, reconstruction")
+                return None
+            embeddings = np.load(embeddings_path, mmap_mode="r")
+            ids = np.load(ids_path)
+            if set(ids.tolist()) != set(articles):
+                logger.warning("Index persistant incohérent avec le corpus, reconstruction")
+                return None
+            if metadata.get("index") != index_signature():
+                # Embeddings toujours valides: seul l'index est reconstruit.
+                logger.info("Paramètres d'index modifiés, reconstruction sans ré-encodage")
+                index = build_index(np.asarray(embeddings), ids)
+                rebuilt = True
+            else:
+                index = self._read_index(index_path)
+                configure_search(index)
+                rebuilt = False
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Index persistant illisible (%s), reconstruction", exc)
+            return None
+        if index.ntotal != len(articles):
+            logger.warning("Index persistant incohérent avec le corpus, reconstruction")
+            return None
+        logger.info("Index FAISS chargé depuis %s (%s vecteurs)", self.index_dir, index.ntotal)
+        state = _IndexState(
+            index=index,
+            articles=articles,
+            ids=ids,
+            embeddings=embeddings,
+            version=int(metadata.get("version", 0)),
+        )
+        if rebuilt:
+            self._save_index(state, corpus_hash)
+        return state
+
+    @staticmethod
+    def _read_index(index_path: Path) -> faiss.Index:
+        """Lit l'index FAISS en mémoire mappée, avec repli sur une lecture classique."""
+
+        try:
+            return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+        except RuntimeError:
+            return faiss.read_index(str(index_path))
+
+    def _save_index(self, state: _IndexState, corpus_hash: str) -> bool:
+        """Persiste l'index, les embeddings et l'empreinte du corpus (écritures atomiques).
+
+        Returns:
+            ``True`` si la sauvegarde a abouti.
+        """
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        try:
+            index_tmp = self.index_dir / f"index.faiss.{pid}.tmp"
+            faiss.write_index(state.index, str(index_tmp))
+            os.replace(index_tmp, self.index_dir / "index.faiss")
+
+            for name, array in (("embeddings", state.embeddings), ("ids", state.ids)):
+                array_tmp = self.index_dir / f"{name}.{pid}.tmp.npy"
+                np.save(array_tmp, np.asarray(array))
+                os.replace(array_tmp, self.index_dir / f"{name}.npy")
+
+            # Les métadonnées sont écrites en dernier: elles valident l'ensemble.
+            metadata_tmp = self.index_dir / f"metadata.{pid}.tmp"
+            with open(metadata_tmp, "w", encoding="utf-8") as metadata_file:
+                json.dump(
+                    {
+                        "corpus_hash": corpus_hash,
+                        "model": settings.models.sentence_embedding_model,
+                        "backend": settings.models.embedding_backend,
+                        "count": int(state.index.ntotal),
+                        "dimension": int(state.index.d),
+                        "index": index_signature(),
+                        "version": state.version,
+                    },
+                    metadata_file,
+                )
+            os.replace(metadata_tmp, self.index_dir / "metadata.json")
+            logger.info("Index FAISS sauvegardé dans %s", self.index_dir)
+            return True
+        except OSError as exc:
+            logger.warning("Impossible de sauvegarder l'index FAISS: %s", exc)
+            return False
 
     def _embed_texts(self, texts: List[str]) -> np.ndarray:
         """Génère les embeddings normalisés pour une liste de textes."""
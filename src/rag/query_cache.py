@@ -0,0 +1,75 @@
+"""Cache LRU à expiration pour les requêtes RAG (embeddings et résultats)."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def normalize_query(query: str) -> str:
+    """Forme canonique d'une requête: minuscules et espaces normalisés."""
+
+    return " ".join(query.casefold().split())
+
+
+class QueryCache(Generic[V]):
+    """Cache LRU borné, thread-safe, dont les entrées expirent après ``ttl_seconds``.
+
+    Une taille maximale nulle désactive le cache (toutes les lectures sont des
+    échecs et rien n'est conservé).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Retourne la valeur associée à la clé, ou ``None`` si absente ou expirée."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl_seconds > 0 and entry[0] < time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Enregistre une valeur en évinçant les entrées les moins récemment utilisées."""
+
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vide le cache sans réinitialiser les compteurs."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs exposés pour la supervision."""
+
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }